@@ -0,0 +1,19 @@
+"""Shared agent runtime exports."""
+
+from .agent_runtime import (
+    api_key,
+    background_loop,
+    base_url,
+    get_runner,
+    refresh_settings,
+    run_sync,
+)
+
+__all__ = [
+    "api_key",
+    "background_loop",
+    "base_url",
+    "get_runner",
+    "refresh_settings",
+    "run_sync",
+]
@@ -0,0 +1,98 @@
+"""Dedalus settings, client and event-loop plumbing shared by the agents."""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Coroutine, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from dedalus_labs import DedalusRunner
+
+__all__ = [
+    "api_key",
+    "background_loop",
+    "base_url",
+    "get_runner",
+    "refresh_settings",
+    "run_sync",
+]
+
+T = TypeVar("T")
+
+# Read .env once at import rather than on every call
+load_dotenv()
+_API_KEY = os.getenv("DEDALUS_API_KEY")
+_BASE_URL = os.getenv("DEDALUS_BASE_URL")
+
+
+def api_key() -> Optional[str]:
+    """DEDALUS_API_KEY as read at import or by the last refresh_settings()."""
+    return _API_KEY
+
+
+def base_url() -> Optional[str]:
+    """DEDALUS_BASE_URL as read at import or by the last refresh_settings()."""
+    return _BASE_URL
+
+
+def refresh_settings() -> None:
+    """Re-read the Dedalus settings, e.g. after a test changes the environment."""
+    global _API_KEY, _BASE_URL
+    _API_KEY = os.getenv("DEDALUS_API_KEY")
+    _BASE_URL = os.getenv("DEDALUS_BASE_URL")
+    _RUNNERS.clear()
+
+
+# Shared runners so calls reuse the client's pooled connections, keyed by name since
+# some agents configure their client differently. A runner's HTTP client is tied to
+# the loop it first ran on, so a different running loop gets a new one.
+_RUNNERS: dict[str, tuple[asyncio.AbstractEventLoop, DedalusRunner]] = {}
+
+
+def get_runner(name: str = "default", **client_options: Any) -> DedalusRunner:
+    """
+    Return the shared runner called ``name`` for the running event loop.
+
+    ``client_options`` are passed to AsyncDedalus on top of the API key and base
+    URL; they only take effect when the runner is (re)built.
+    """
+    # No awaits between the check and the assignment, so this is safe without a lock
+    loop = asyncio.get_running_loop()
+    entry = _RUNNERS.get(name)
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+
+    # Imported here so no-API-key fallbacks and template imports skip the SDK
+    from dedalus_labs import AsyncDedalus, DedalusRunner
+
+    options: dict[str, Any] = {"api_key": _API_KEY}
+    if _BASE_URL:
+        options["base_url"] = _BASE_URL
+    options.update(client_options)
+    runner = DedalusRunner(AsyncDedalus(**options))
+    _RUNNERS[name] = (loop, runner)
+    return runner
+
+
+# One long-lived loop on a daemon thread for the *_sync helpers, so repeated calls
+# reuse the runners and their connection pools instead of a fresh asyncio.run loop
+_LOOP: asyncio.AbstractEventLoop | None = None
+_LOOP_LOCK = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="agent-runtime-loop", daemon=True).start()
+        return _LOOP
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` on the background loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, background_loop()).result()
@@ -2,6 +2,7 @@
 from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.schemas import (
@@ -12,7 +13,11 @@ from app.api.schemas import (
     UserSignup,
 )
 from app.config.settings import settings
-from app.middleware.auth import get_current_user, get_current_user_optional
+from app.middleware.auth import (
+    get_current_user,
+    get_current_user_optional,
+    invalidate_user_cache,
+)
 from app.models import OnboardingStatus, User, get_db
 from app.utils.security import create_access_token, get_password_hash, verify_password
 from app.utils import user_store
@@ -47,7 +52,7 @@ def signup(user_data: UserSignup) -> Token:
     db = next(db_gen)
     try:
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        existing_user = db.query(User).filter(func.lower(User.email) == user_data.email.strip().lower()).first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -67,6 +72,7 @@ def signup(user_data: UserSignup) -> Token:
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
+        invalidate_user_cache(new_user.id)
         
         # Create access token
         access_token = create_access_token(
@@ -111,7 +117,7 @@ def login(user_data: UserLogin) -> Token:
     db = next(db_gen)
     try:
         # Find user by email
-        user = db.query(User).filter(User.email == user_data.email).first()
+        user = db.query(User).filter(func.lower(User.email) == user_data.email.strip().lower()).first()
         
         if not user or not verify_password(user_data.password, user.hashed_password):
             raise HTTPException(
@@ -1,4 +1,5 @@
 """Chat API routes."""
+import asyncio
 from datetime import datetime
 import json
 from pathlib import Path
@@ -12,7 +13,7 @@ from app.api.mock_data import MOCK_CHATS, MOCK_MESSAGES, MOCK_GROUPS
 from app.api.schemas import MessageCreate, MessageResponse, MessageSendResponse
 from app.middleware.auth import get_current_user
 from app.models import User
-from app.utils.transactions_loader import load_user_transactions
+from app.utils.transactions_loader import load_user_transactions_async
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 if str(PROJECT_ROOT) not in sys.path:
@@ -161,15 +162,12 @@ async def create_message(
                 )
 
                 valid_agents = {"individual", "credit_score", "group_task", "conversational"}
-                results: list[tuple[str, str]] = []
 
-                for key in agent_keys[:3]:
-                    if key not in valid_agents:
-                        continue
+                async def run_agent(key: str) -> tuple[str, str]:
                     try:
                         logger.info(f"KEY: {key}")
                         if key == "individual":
-                            mock_purchases = load_user_transactions(current_user.id)
+                            mock_purchases = await load_user_transactions_async(current_user.id)
                             output = await run_individual_agent(
                                 mock_purchases=mock_purchases,
                                 user_query=user_query,
@@ -206,10 +204,18 @@ async def create_message(
                                 today=today_str,
                             )
 
-                        results.append((key, output.strip()))
+                        return key, output.strip()
                     except Exception as agent_exc:
                         logger.exception("Agent %s failed: %s", key, agent_exc)
-                        results.append((key, "I ran into an issue generating a response. Please try again later."))
+                        return key, "I ran into an issue generating a response. Please try again later."
+
+                # Selected specialists are independent, so run them concurrently;
+                # gather keeps the results in the decider's order
+                results: list[tuple[str, str]] = list(
+                    await asyncio.gather(
+                        *(run_agent(key) for key in agent_keys[:3] if key in valid_agents)
+                    )
+                )
 
                 if not results:
                     agent_output = "I couldn't decide which specialist to use. Try rephrasing your request!"
@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Any, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 # ============= Auth Schemas =============
@@ -22,6 +22,8 @@ class UserLogin(BaseModel):
 
 class Token(BaseModel):
     """JWT token response schema."""
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str = "bearer"
 
@@ -34,6 +36,8 @@ class TokenData(BaseModel):
 
 class UserResponse(BaseModel):
     """User response schema."""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     name: str
     email: str
@@ -41,12 +45,11 @@ class UserResponse(BaseModel):
     preferences: dict[str, Any] = {}
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class SessionResponse(BaseModel):
     """Session info response schema."""
+    model_config = ConfigDict(frozen=True)
+
     user: UserResponse
     authenticated: bool = True
 
@@ -61,6 +64,8 @@ class MessageCreate(BaseModel):
 
 class MessageResponse(BaseModel):
     """Message response schema."""
+    model_config = ConfigDict(frozen=True)
+
     id: int
     chat_id: int
     sender_id: Optional[int]
@@ -74,6 +79,8 @@ class MessageResponse(BaseModel):
 
 class MessageSendResponse(BaseModel):
     """Response returned when sending a chat message."""
+    model_config = ConfigDict(frozen=True)
+
     user_message: MessageResponse
     ai_message: Optional[MessageResponse] = None
 
@@ -88,6 +95,8 @@ class GroupCreate(BaseModel):
 
 class GroupResponse(BaseModel):
     """Group response schema."""
+    model_config = ConfigDict(frozen=True)
+
     id: int
     name: str
     members: list[dict[str, Any]]
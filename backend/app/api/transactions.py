@@ -1,12 +1,16 @@
 """Transactions API routes - Fetch and sync transaction data from Knot"""
 from typing import Any, Optional, Dict
+import asyncio
 from datetime import datetime, timedelta, timezone
+from itertools import chain, islice
 from pathlib import Path
 import json
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from loguru import logger
+import msgspec
 
+from app.config.settings import settings
 from app.middleware.auth import get_current_user
 from app.models import User
 from app.integrations.knot import KnotClient, KnotAPIError
@@ -67,6 +71,19 @@ SAMPLE_TRANSACTION_TEMPLATES: Dict[str, list[dict[str, Any]]] = {
     ],
 }
 
+# Pre-format each template's line items once so sample builds don't redo it per call.
+# Stored as immutable (name, quantity, price) tuples; fresh dicts are built per transaction.
+SAMPLE_TEMPLATE_PRODUCTS: Dict[str, tuple[tuple[tuple[str, int, str], ...], ...]] = {
+    key: tuple(
+        tuple(
+            (item["name"], item.get("quantity", 1), f"{item.get('price', 0.0):.2f}")
+            for item in template.get("items", [])
+        )
+        for template in templates
+    )
+    for key, templates in SAMPLE_TRANSACTION_TEMPLATES.items()
+}
+
 SAMPLE_MERCHANT_ALIASES = {
     "36": "ubereats",
     "ubereats": "ubereats",
@@ -91,47 +108,54 @@ def _normalize_transaction(
     merchant_id: str,
     merchant_name: str,
 ) -> Dict[str, Any]:
-    txn_payload = raw_txn.model_dump() if hasattr(raw_txn, "model_dump") else dict(raw_txn)
-    txn_payload.setdefault("merchant_id", merchant_id)
-    txn_payload.setdefault("merchant_name", merchant_name)
+    txn_payload = (
+        msgspec.structs.asdict(raw_txn) if isinstance(raw_txn, msgspec.Struct) else dict(raw_txn)
+    )
+    get = txn_payload.get
 
-    price = txn_payload.get("price") or {}
+    price = get("price") or {}
     if not isinstance(price, dict):
         price = {}
-    txn_payload["price"] = price
+    metadata = get("metadata") or {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    price_get = price.get
+    metadata_get = metadata.get
 
     amount_candidate = (
-        price.get("amount")
-        or price.get("total")
-        or price.get("final_total")
-        or price.get("sub_total")
-        or txn_payload.get("amount")
+        price_get("amount")
+        or price_get("total")
+        or price_get("final_total")
+        or price_get("sub_total")
+        or get("amount")
     )
+
+    # Derive every field from locals first, then write them back in one update
+    normalized: Dict[str, Any] = {
+        "merchant_id": get("merchant_id", merchant_id),
+        "merchant_name": get("merchant_name", merchant_name),
+        "price": price,
+        "price_currency": price_get("currency", "USD"),
+        "metadata": metadata,
+        "order_id": (
+            metadata_get("order_id")
+            or metadata_get("external_id")
+            or get("external_id")
+            or get("id")
+        ),
+        "transaction_status": (
+            get("order_status")
+            or metadata_get("status")
+            or metadata_get("order_status")
+        ),
+    }
     if amount_candidate is not None:
         try:
-            txn_payload["price_amount"] = float(amount_candidate)
+            normalized["price_amount"] = float(amount_candidate)
         except (TypeError, ValueError):
             pass
 
-    txn_payload["price_currency"] = price.get("currency", "USD")
-
-    metadata = txn_payload.get("metadata") or {}
-    if not isinstance(metadata, dict):
-        metadata = {}
-    txn_payload["metadata"] = metadata
-
-    txn_payload["order_id"] = (
-        metadata.get("order_id")
-        or metadata.get("external_id")
-        or txn_payload.get("external_id")
-        or txn_payload.get("id")
-    )
-    txn_payload["transaction_status"] = (
-        txn_payload.get("order_status")
-        or metadata.get("status")
-        or metadata.get("order_status")
-    )
-
+    txn_payload.update(normalized)
     return txn_payload
 
 
@@ -154,6 +178,7 @@ def _build_sample_transactions(merchant_id: str, merchant_name: str) -> list[dic
     now = datetime.utcnow().replace(tzinfo=timezone.utc)
     samples: list[dict[str, Any]] = []
 
+    template_products = SAMPLE_TEMPLATE_PRODUCTS[template_key]
     for idx, template in enumerate(SAMPLE_TRANSACTION_TEMPLATES[template_key], start=1):
         total = (
             template["subtotal"]
@@ -189,12 +214,8 @@ def _build_sample_transactions(merchant_id: str, merchant_name: str) -> list[dic
                 "adjustments": [],
             },
             "products": [
-                {
-                    "name": item["name"],
-                    "quantity": item.get("quantity", 1),
-                    "price": f"{item.get('price', 0.0):.2f}",
-                }
-                for item in template.get("items", [])
+                {"name": name, "quantity": quantity, "price": price}
+                for name, quantity, price in template_products[idx - 1]
             ],
             "metadata": {
                 "order_id": order_id,
@@ -215,11 +236,20 @@ def _build_sample_transactions(merchant_id: str, merchant_name: str) -> list[dic
     return samples
 
 
+async def _discard_speculative_sync(task: Optional[asyncio.Task]) -> None:
+    """Cancel an unused speculative sync and wait for it to unwind before the client closes."""
+    if task is None:
+        return
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
 @router.get("/sync")
 async def sync_transactions(
     merchant_id: Optional[str] = Query(None, description="Merchant ID (e.g., '36' for Ubereats)"),
     limit: int = Query(100, ge=1, le=500, description="Max transactions to fetch"),
     cursor: Optional[str] = Query(None, description="Pagination cursor"),
+    debug: bool = Query(False, description="Include the raw Knot response in the payload"),
     current_user: User = Depends(get_current_user),
 ) -> dict[str, Any]:
     """
@@ -227,13 +257,39 @@ async def sync_transactions(
     
     - If merchant_id is provided, sync only that merchant
     - If merchant_id is None, sync all linked merchants
+    - raw_response is only serialized when debug=true or settings.DEBUG is set
     """
     
     knot = KnotClient()
+    speculative_sync: Optional[asyncio.Task] = None
     
     try:
         # First, get user's linked accounts
         external_user_id = KNOT_EXTERNAL_IDS.get(current_user.id, str(current_user.id))
+
+        # If this exact merchant string resolved to a cached account before, start
+        # syncing it again while the account lookup is in flight; the result is only
+        # used if the lookup agrees.
+        cached_entry = (
+            TRANSACTIONS_CACHE.get(current_user.id, {}).get(str(merchant_id))
+            if merchant_id
+            else None
+        )
+        if (
+            cached_entry
+            and cached_entry.get("account_id")
+            and cached_entry.get("resolved_from") == str(merchant_id)
+        ):
+            speculative_sync = asyncio.create_task(
+                knot.sync_transactions(
+                    external_user_id=external_user_id,
+                    merchant_id=str(merchant_id),
+                    account_id=cached_entry["account_id"],
+                    cursor=cursor,
+                    limit=limit,
+                )
+            )
+
         try:
             accounts = await knot.get_accounts(external_user_id)
         except KnotAPIError as account_err:
@@ -306,13 +362,23 @@ async def sync_transactions(
             f"Syncing transactions for user {current_user.id}, merchant {selected_account.merchant_id} ({selected_account.merchant_name})"
         )
         
-        sync_response = await knot.sync_transactions(
-            external_user_id=external_user_id,
-            merchant_id=str(selected_account.merchant_id),
-            account_id=str(selected_account.id),
-            cursor=cursor,
-            limit=limit,
-        )
+        if (
+            speculative_sync is not None
+            and cached_entry is not None
+            and merchant_id_str == str(merchant_id)
+            and str(selected_account.id) == cached_entry["account_id"]
+        ):
+            sync_response = await speculative_sync
+        else:
+            await _discard_speculative_sync(speculative_sync)
+            speculative_sync = None
+            sync_response = await knot.sync_transactions(
+                external_user_id=external_user_id,
+                merchant_id=merchant_id_str,
+                account_id=str(selected_account.id),
+                cursor=cursor,
+                limit=limit,
+            )
         
         transactions_payload = [
             _normalize_transaction(
@@ -372,15 +438,20 @@ async def sync_transactions(
             "limit": sync_response.limit or limit,
             "synced_at": datetime.utcnow().isoformat(),
             "merchant": merchant_payload,
+            "account_id": str(selected_account.id),
+            "resolved_from": str(merchant_id) if merchant_id else None,
         }
         user_cache[merchant_id_str] = user_cache_entry
-        raw_response = sync_response.model_dump()
-        if fallback_used:
-            raw_response = {
-                **raw_response,
-                "fallback": "sample_transactions",
-                "transactions": transactions_payload,
-            }
+        # Serializing the full sync response is debugging exhaust; skip it unless asked for
+        raw_response: Optional[Dict[str, Any]] = None
+        if settings.DEBUG or debug:
+            raw_response = msgspec.to_builtins(sync_response)
+            if fallback_used:
+                raw_response = {
+                    **raw_response,
+                    "fallback": "sample_transactions",
+                    "transactions": transactions_payload,
+                }
         user_cache_entry["raw_response"] = raw_response
 
         file_path = _dump_transactions_to_file(
@@ -426,6 +497,7 @@ async def sync_transactions(
             detail=str(e)
         )
     finally:
+        await _discard_speculative_sync(speculative_sync)
         await knot.close()
 
 
@@ -462,12 +534,15 @@ async def get_transactions(
             "message": "Use /transactions/sync to fetch fresh data from Knot" if not transactions else None,
         }
     
-    # Aggregate all merchants
-    aggregated_transactions = []
-    for merchant_data in user_cache.values():
-        aggregated_transactions.extend(merchant_data.get("transactions", []))
-    
-    aggregated_transactions = aggregated_transactions[:limit]
+    # Aggregate all merchants, stopping once `limit` transactions have been collected
+    aggregated_transactions = list(
+        islice(
+            chain.from_iterable(
+                merchant_data.get("transactions", ()) for merchant_data in user_cache.values()
+            ),
+            limit,
+        )
+    )
     
     return {
         "success": True,
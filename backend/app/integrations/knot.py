@@ -1,12 +1,13 @@
 """Knot API Integration Client"""
 import httpx
+import msgspec
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
     retry_if_exception_type,
 )
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Type
 from datetime import datetime
 import base64
 from loguru import logger
@@ -83,9 +84,15 @@ class KnotClient:
         self,
         method: str,
         endpoint: str,
+        response_type: Optional[Type[Any]] = None,
         **kwargs,
-    ) -> Dict[str, Any]:
-        """Make HTTP request with retry logic"""
+    ) -> Any:
+        """
+        Make HTTP request with retry logic
+
+        If response_type is given, the body is decoded straight from bytes into
+        that msgspec type instead of going through an intermediate dict.
+        """
         if self.mock_mode or not self.client:
             raise KnotAPIError(
                 status_code=500,
@@ -110,6 +117,8 @@ class KnotClient:
                 )
             
             response.raise_for_status()
+            if response_type is not None:
+                return msgspec.json.decode(response.content, type=response_type)
             return response.json()
             
         except httpx.HTTPStatusError as e:
@@ -149,14 +158,16 @@ class KnotClient:
         }
         
         logger.info(f"Creating Knot session for user {external_user_id}")
-        result = await self._request("POST", "/session/create", json=payload)
-        return KnotSession(**result)
+        return await self._request(
+            "POST", "/session/create", response_type=KnotSession, json=payload
+        )
     
     async def extend_session(self, session_id: str) -> KnotSession:
         """Extend an existing session"""
         payload = {"session_id": session_id}
-        result = await self._request("POST", "/session/extend", json=payload)
-        return KnotSession(**result)
+        return await self._request(
+            "POST", "/session/extend", response_type=KnotSession, json=payload
+        )
     
     # ==================== MERCHANTS ====================
     
@@ -176,7 +187,7 @@ class KnotClient:
         payload = {"type": merchant_type}
         result = await self._request("POST", "/merchant/list", json=payload)
         merchants_data = result.get("merchants", [])
-        return [KnotMerchant(**m) for m in merchants_data]
+        return msgspec.convert(merchants_data, List[KnotMerchant])
     
     # ==================== ACCOUNTS ====================
     
@@ -315,8 +326,12 @@ class KnotClient:
         logger.info(
             f"Syncing transactions for user {external_user_id} merchant {merchant_id} account {account_id}"
         )
-        result = await self._request("POST", "/transactions/sync", json=payload)
-        return KnotTransactionSyncResponse(**result)
+        return await self._request(
+            "POST",
+            "/transactions/sync",
+            response_type=KnotTransactionSyncResponse,
+            json=payload,
+        )
     
     async def get_transaction(self, transaction_id: str) -> Dict[str, Any]:
         """Get details for a specific transaction"""
@@ -1,47 +1,49 @@
-"""Pydantic models for Knot API responses"""
-from pydantic import BaseModel, Field, ConfigDict, computed_field
-from typing import Optional, List, Dict, Any
+"""msgspec models for Knot API responses"""
+from typing import Optional, List, Dict, Any, Union
 
+import msgspec
 
-class KnotSession(BaseModel):
+
+class KnotSession(msgspec.Struct, kw_only=True):
     """Response from POST /session/create"""
-    model_config = ConfigDict(populate_by_name=True)
-    
+
     session: str  # Knot returns "session" not "session_id"
     session_token: Optional[str] = None
     expires_at: Optional[str] = None
-    
-    # Computed property for backward compatibility
-    @computed_field
+
     @property
     def session_id(self) -> str:
         """Return session as session_id for backward compatibility"""
         return self.session
 
 
-class KnotMerchant(BaseModel):
+class KnotMerchant(msgspec.Struct, kw_only=True):
     """Merchant from POST /merchant/list"""
     id: str
     name: str
     logo_url: Optional[str] = None
-    supported_features: List[str] = []
+    supported_features: List[str] = msgspec.field(default_factory=list)
 
 
-class KnotAccount(BaseModel):
+class KnotAccount(msgspec.Struct, kw_only=True):
     """Account from GET /accounts/get"""
-    model_config = ConfigDict(extra="allow")
-    
+
     id: str
     merchant_id: str
     merchant_name: str
     status: Optional[str] = "unknown"
-    permissions: Dict[str, Any] = Field(default_factory=dict)
+    permissions: Dict[str, Any] = msgspec.field(default_factory=dict)
     linked_at: Optional[str] = None
+    raw: Optional[Dict[str, Any]] = None
+
 
+class KnotTransaction(msgspec.Struct, kw_only=True):
+    """
+    Transaction from POST /transactions/sync
 
-class KnotTransaction(BaseModel):
-    """Transaction from POST /transactions/sync"""
-    model_config = ConfigDict(extra="allow")
+    Unknown keys are dropped while decoding; fields read downstream (such as the
+    top-level amount fallback used when normalizing) must be declared here.
+    """
 
     id: str
     merchant_id: Optional[str] = None
@@ -51,15 +53,15 @@ class KnotTransaction(BaseModel):
     order_status: Optional[str] = None
     payment_methods: Optional[List[Dict[str, Any]]] = None
     price: Optional[Dict[str, Any]] = None
+    amount: Optional[Union[str, float]] = None
     products: Optional[List[Dict[str, Any]]] = None
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = msgspec.field(default_factory=dict)
 
 
-class KnotTransactionSyncResponse(BaseModel):
+class KnotTransactionSyncResponse(msgspec.Struct, kw_only=True):
     """Response from POST /transactions/sync"""
     merchant: Optional[Dict[str, Any]] = None
     transactions: List[KnotTransaction]
     next_cursor: Optional[str] = None
     has_more: Optional[bool] = None
     limit: Optional[int] = None
-
@@ -1,21 +1,51 @@
 """Main FastAPI application entry point."""
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from app.config.settings import settings
+from app.middleware.auth import CurrentUserContextMiddleware
+from app.middleware.cors import FastCORSMiddleware
+from app.middleware.hot_path import HotPathMiddleware
+from app.middleware.request_logging import RequestLoggingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run application startup and shutdown."""
+    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    logger.info(f"Environment: {settings.ENVIRONMENT}")
+    logger.info(f"Debug mode: {settings.DEBUG}")
+
+    # Open the first pooled connection before serving traffic (DEBUG runs without a DB)
+    if not settings.DEBUG:
+        from app.models import engine
+
+        try:
+            engine.connect().close()
+        except Exception as exc:
+            logger.warning(f"Database warm-up failed: {exc}")
+
+    yield
+
+    logger.info("Shutting down application")
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
+ALLOWED_ORIGINS = frozenset(
+    {
         "http://localhost:3000",  # Local development
         "http://127.0.0.1:3000",  # Local development via 127.0.0.1
         "http://0.0.0.0:3000",  # Docker/local network access
@@ -30,7 +60,12 @@ app.add_middleware(
         "https://frontend-omega-sepia-46.vercel.app",  # Production domain
         "https://frontend-aryamangoenkas-projects.vercel.app",  # Frontend production domain
         "https://e5e88adea615.ngrok-free.app",  # ngrok tunnel
-    ],
+    }
+)
+
+app.add_middleware(
+    FastCORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*", "ngrok-skip-browser-warning"],
@@ -39,31 +74,21 @@ app.add_middleware(
 
 
 # Add logging middleware for debugging CORS issues
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests to debug CORS issues."""
-    origin = request.headers.get("origin", "No Origin")
-    method = request.method
-    path = request.url.path
-    
-    logger.debug(f"🌐 Request: {method} {path} from origin: {origin}")
-    
-    response = await call_next(request)
-    return response
-
-
-@app.on_event("startup")
-async def startup_event() -> None:
-    """Run on application startup."""
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
+app.add_middleware(RequestLoggingMiddleware)
 
+# Scope the authenticated-user memo to each request
+app.add_middleware(CurrentUserContextMiddleware)
 
-@app.on_event("shutdown")
-async def shutdown_event() -> None:
-    """Run on application shutdown."""
-    logger.info("Shutting down application")
+# Minimal app for hot endpoints (liveness probes); no CORS or logging middleware
+fast_app = FastAPI(
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
+    default_response_class=ORJSONResponse,
+)
+
+# Added last so it is the outermost middleware and runs before CORS/logging
+app.add_middleware(HotPathMiddleware, hot_app=fast_app, paths={"/health"})
 
 
 @app.get("/")
@@ -76,7 +101,7 @@ async def root() -> dict[str, str]:
     }
 
 
-@app.get("/health")
+@fast_app.get("/health")
 async def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy"}
@@ -94,4 +119,3 @@ app.include_router(accounts.router, prefix="/api/accounts", tags=["Accounts"])
 app.include_router(transactions.router, prefix="/api/transactions", tags=["Transactions"])
 app.include_router(insights.router, prefix="/api/insights", tags=["Insights"])
 app.include_router(settings_router.router, prefix="/api/settings", tags=["Settings"])
-
@@ -1,31 +1,169 @@
 """Authentication middleware and dependencies."""
+from contextvars import ContextVar
 from datetime import datetime
+from functools import lru_cache
+import threading
 from typing import Optional
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.config.settings import settings
-from app.models import User
-from app.utils.security import decode_access_token
+from app.models import OnboardingStatus, SessionLocal, User
+from app.utils.security import cached_decode_access_token
 from app.utils import user_store
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# Stored onboarding status value -> enum member, avoiding EnumMeta.__call__
+_ONBOARDING_MAP = {status_.value: status_ for status_ in OnboardingStatus}
+
+# Per-request memo of resolved users keyed by token. The middleware installs a
+# fresh dict for each request; sync dependencies run in worker threads with a
+# copy of the context, so they share the dict rather than setting the var.
+_current_user_cv: ContextVar[Optional[dict[str, User]]] = ContextVar(
+    "current_user", default=None
+)
+
+
+# Detached User rows from the production DB path, keyed by id
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_user_cache_lock = threading.Lock()
+
+
+class CurrentUserContextMiddleware:
+    """Scope the current-user memo to a single request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_user_cv.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_user_cv.reset(token)
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop the cached User for user_id so the next lookup reads the database."""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(mapper, connection, target: User) -> None:
+    """Evict a user from the cache whenever a flush writes or deletes its row."""
+    if target.id is not None:
+        invalidate_user_cache(target.id)
+
+
+def get_user_cached(user_id: int) -> Optional[User]:
+    """
+    Fetch a User by primary key, reusing the detached instance for up to 30s.
+
+    The user is expunged with only its columns loaded, so relationships such as
+    linked_accounts are not available on it; callers that need them, or need to
+    modify the user, should reattach with db.merge(user, load=False).
+    """
+    with _user_cache_lock:
+        user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if user is not None:
+            db.expunge(user)
+    finally:
+        db.close()
+
+    if user is not None:
+        with _user_cache_lock:
+            _user_cache[user_id] = user
+    return user
+
+
+def _parse_timestamp(raw: Optional[str]) -> datetime:
+    """Parse a stored ISO timestamp, falling back to now."""
+    if raw:
+        try:
+            return datetime.fromisoformat(raw)
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+
+@lru_cache(maxsize=1024)
+def _build_debug_user(user_id: int, stored_sig: tuple) -> User:
+    """
+    Build the debug-mode User for a stored record.
+
+    stored_sig is (name, email, onboarding_status, created_at, updated_at); since
+    update_user always bumps updated_at, a changed record gets a new cache entry.
+    """
+    name, email, onboarding_status, created_at_raw, updated_at_raw = stored_sig
+    stored_user = user_store.get_user_by_id(user_id) or {}
+
+    debug_user = User(
+        id=user_id,
+        name=name,
+        email=email,
+        hashed_password=stored_user.get("hashed_password", ""),
+        onboarding_status=_ONBOARDING_MAP[onboarding_status],
+        preferences=dict(stored_user.get("preferences") or {}),
+    )
+    debug_user.created_at = _parse_timestamp(created_at_raw)
+    debug_user.updated_at = _parse_timestamp(updated_at_raw)
+    return debug_user
+
+
+def _debug_user_from_store(stored_user: dict, payload: dict) -> User:
+    """Return the (cached) debug-mode User for a user_store record."""
+    stored_sig = (
+        stored_user.get("name") or payload.get("name", "Demo User"),
+        stored_user.get("email") or payload.get("email", "demo@example.com"),
+        stored_user.get("onboarding_status", OnboardingStatus.COMPLETE.value),
+        stored_user.get("created_at"),
+        stored_user.get("updated_at"),
+    )
+    return _build_debug_user(stored_user["id"], stored_sig)
+
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> User:
     """Get current authenticated user from JWT token."""
+    token = credentials.credentials
+    memo = _current_user_cv.get()
+    if memo is not None and token in memo:
+        return memo[token]
+
+    user = _load_current_user(token)
+    if memo is not None:
+        memo[token] = user
+    return user
+
+
+def _load_current_user(token: str) -> User:
+    """Resolve the user for a JWT token, raising 401 if it is invalid."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = cached_decode_access_token(token)
     
     if payload is None:
         raise credentials_exception
@@ -36,41 +174,9 @@ def get_current_user(
     
     # If DEBUG mode, always return mock user
     if settings.DEBUG:
-        from app.models import OnboardingStatus
-
         stored_user = user_store.get_user_by_id(user_id)
         if stored_user is not None:
-            onboarding_status = stored_user.get("onboarding_status", OnboardingStatus.COMPLETE.value)
-            preferences = stored_user.get("preferences") or {}
-            created_at_raw = stored_user.get("created_at")
-            updated_at_raw = stored_user.get("updated_at")
-
-            debug_user = User(
-                id=stored_user["id"],
-                name=stored_user.get("name") or payload.get("name", "Demo User"),
-                email=stored_user.get("email") or payload.get("email", "demo@example.com"),
-                hashed_password=stored_user.get("hashed_password", ""),
-                onboarding_status=OnboardingStatus(onboarding_status),
-                preferences=preferences,
-            )
-
-            if created_at_raw:
-                try:
-                    debug_user.created_at = datetime.fromisoformat(created_at_raw)
-                except ValueError:
-                    debug_user.created_at = datetime.utcnow()
-            else:
-                debug_user.created_at = datetime.utcnow()
-
-            if updated_at_raw:
-                try:
-                    debug_user.updated_at = datetime.fromisoformat(updated_at_raw)
-                except ValueError:
-                    debug_user.updated_at = datetime.utcnow()
-            else:
-                debug_user.updated_at = datetime.utcnow()
-
-            return debug_user
+            return _debug_user_from_store(stored_user, payload)
 
         # Fallback to payload-only user
         mock_user = User(
@@ -87,16 +193,10 @@ def get_current_user(
     
     # Production mode: query database
     # This will only run if DEBUG=False
-    from app.models import get_db
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if user is None:
-            raise credentials_exception
-        return user
-    finally:
-        db.close()
+    user = get_user_cached(user_id)
+    if user is None:
+        raise credentials_exception
+    return user
 
 
 def get_current_user_optional(
@@ -106,9 +206,13 @@ def get_current_user_optional(
     if credentials is None:
         return None
     
+    memo = _current_user_cv.get()
+    if memo is not None and credentials.credentials in memo:
+        return memo[credentials.credentials]
+
     try:
         token = credentials.credentials
-        payload = decode_access_token(token)
+        payload = cached_decode_access_token(token)
         
         if payload is None:
             return None
@@ -119,40 +223,9 @@ def get_current_user_optional(
         
         # If DEBUG mode, return mock user
         if settings.DEBUG:
-            from app.models import OnboardingStatus
             stored_user = user_store.get_user_by_id(user_id)
             if stored_user is not None:
-                onboarding_status = stored_user.get("onboarding_status", OnboardingStatus.COMPLETE.value)
-                preferences = stored_user.get("preferences") or {}
-                created_at_raw = stored_user.get("created_at")
-                updated_at_raw = stored_user.get("updated_at")
-
-                debug_user = User(
-                    id=stored_user["id"],
-                    name=stored_user.get("name") or payload.get("name", "Demo User"),
-                    email=stored_user.get("email") or payload.get("email", "demo@example.com"),
-                    hashed_password=stored_user.get("hashed_password", ""),
-                    onboarding_status=OnboardingStatus(onboarding_status),
-                    preferences=preferences,
-                )
-
-                if created_at_raw:
-                    try:
-                        debug_user.created_at = datetime.fromisoformat(created_at_raw)
-                    except ValueError:
-                        debug_user.created_at = datetime.utcnow()
-                else:
-                    debug_user.created_at = datetime.utcnow()
-
-                if updated_at_raw:
-                    try:
-                        debug_user.updated_at = datetime.fromisoformat(updated_at_raw)
-                    except ValueError:
-                        debug_user.updated_at = datetime.utcnow()
-                else:
-                    debug_user.updated_at = datetime.utcnow()
-
-                return debug_user
+                return _debug_user_from_store(stored_user, payload)
 
             mock_user = User(
                 id=user_id,
@@ -167,14 +240,7 @@ def get_current_user_optional(
             return mock_user
         
         # Production mode: query database
-        from app.models import get_db
-        db_gen = get_db()
-        db = next(db_gen)
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            return user
-        finally:
-            db.close()
+        return get_user_cached(user_id)
     except Exception:
         return None
 
@@ -0,0 +1,27 @@
+"""CORS middleware with constant-time origin checks."""
+from typing import Any, Sequence
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp
+
+
+class FastCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that checks explicit origins against a frozenset.
+
+    Starlette already pre-builds the simple/preflight header dicts (including the
+    joined Access-Control-Allow-Methods value) in ``__init__``; the only per-request
+    linear work left is the ``origin in list`` scan, which this replaces.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Sequence[str] = (), **kwargs: Any) -> None:
+        super().__init__(app, allow_origins=allow_origins, **kwargs)
+        self.allowed_origin_set = frozenset(allow_origins)
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins:
+            return True
+
+        if self.allow_origin_regex is not None and self.allow_origin_regex.fullmatch(origin):
+            return True
+
+        return origin in self.allowed_origin_set
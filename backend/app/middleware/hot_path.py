@@ -0,0 +1,24 @@
+"""Middleware that short-circuits hot paths to a minimal sub-application."""
+from typing import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class HotPathMiddleware:
+    """Dispatch selected paths straight to ``hot_app``.
+
+    Registered as the outermost user middleware, so requests for e.g. ``/health``
+    (hit constantly by liveness probes) skip CORS and request logging entirely.
+    """
+
+    def __init__(self, app: ASGIApp, hot_app: ASGIApp, paths: Iterable[str]) -> None:
+        self.app = app
+        self.hot_app = hot_app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            await self.hot_app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
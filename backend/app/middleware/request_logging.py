@@ -0,0 +1,28 @@
+"""Request logging middleware."""
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RequestLoggingMiddleware:
+    """Log incoming HTTP requests to help debug CORS issues.
+
+    Implemented as a plain ASGI middleware rather than ``@app.middleware("http")``
+    so no extra task or Request/Response objects are created per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = "No Origin"
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+                break
+
+        logger.debug(f"🌐 Request: {scope['method']} {scope['path']} from origin: {origin}")
+        await self.app(scope, receive, send)
@@ -12,7 +12,12 @@ from app.config.settings import settings
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    echo=settings.DEBUG,
+    pool_size=20,
+    max_overflow=40,
+    pool_recycle=3600,
+    query_cache_size=1200,  # keep compiled SQL for hot User/Chat lookups resident
+    echo=settings.SQL_ECHO,
+    future=True,
 )
 
 # Create SessionLocal class
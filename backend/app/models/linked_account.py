@@ -1,5 +1,5 @@
 """Linked account model."""
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Integer, String, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -15,7 +15,10 @@ class LinkedAccount(Base, TimestampMixin):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     institution = Column(String, nullable=False)  # e.g., "Amazon", "DoorDash", "UberEats"
     account_name = Column(String, nullable=False)  # Display name for the account
-    permissions = Column(JSONB, default={}, nullable=False)  # Account permissions/scopes
+    # Account permissions/scopes
+    permissions = Column(
+        JSONB, default=dict, server_default=text("'{}'::jsonb"), nullable=False
+    )
     knot_item_id = Column(String, nullable=True, unique=True, index=True)  # Knot's item ID
 
     # Relationships
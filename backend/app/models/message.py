@@ -1,5 +1,5 @@
 """Message model."""
-from sqlalchemy import Column, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Enum, ForeignKey, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import enum
@@ -33,9 +33,15 @@ class Message(Base, TimestampMixin):
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     sender_type = Column(Enum(SenderType), nullable=False)
     content = Column(Text, nullable=False)
-    thinking = Column(JSONB, default=[], nullable=False)  # Array of thinking steps
+    # Array of thinking steps
+    thinking = Column(
+        JSONB, default=list, server_default=text("'[]'::jsonb"), nullable=False
+    )
     action = Column(Enum(MessageAction), default=MessageAction.NONE, nullable=True)
-    drawer_data = Column(JSONB, default={}, nullable=True)  # Context drawer payload
+    # Context drawer payload
+    drawer_data = Column(
+        JSONB, default=dict, server_default=text("'{}'::jsonb"), nullable=True
+    )
 
     # Relationships
     chat = relationship("Chat", back_populates="messages")
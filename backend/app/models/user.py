@@ -1,5 +1,5 @@
 """User model."""
-from sqlalchemy import Column, Enum, Integer, String
+from sqlalchemy import Column, Enum, Index, Integer, String, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import enum
@@ -29,7 +29,9 @@ class User(Base, TimestampMixin):
         default=OnboardingStatus.INCOMPLETE,
         nullable=False,
     )
-    preferences = Column(JSONB, default={}, nullable=False)
+    preferences = Column(
+        JSONB, default=dict, server_default=text("'{}'::jsonb"), nullable=False
+    )
     auth_provider_id = Column(String, nullable=True)  # For OAuth providers
 
     # Relationships
@@ -38,6 +40,11 @@ class User(Base, TimestampMixin):
     messages = relationship("Message", back_populates="sender")
     linked_accounts = relationship("LinkedAccount", back_populates="user")
 
+    __table_args__ = (
+        # Case-insensitive lookups (lower(email) = ...) resolve through this index
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email}, name={self.name})>"
 
@@ -1,7 +1,11 @@
 """Security utilities for password hashing and JWT tokens."""
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -14,6 +18,10 @@ pwd_context = CryptContext(
     deprecated="auto",
 )
 
+# Verified token payloads, keyed by a digest of the token so memory stays bounded
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_token_cache_lock = threading.Lock()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -47,3 +55,18 @@ def decode_access_token(token: str) -> Optional[dict[str, Any]]:
     except JWTError:
         return None
 
+
+def cached_decode_access_token(token: str) -> Optional[dict[str, Any]]:
+    """Decode a JWT access token, reusing recently verified payloads."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        payload = _token_cache.get(key)
+
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+
+    payload = decode_access_token(token)
+    if payload is not None:
+        with _token_cache_lock:
+            _token_cache[key] = payload
+    return payload
@@ -1,41 +1,92 @@
 """Helpers for loading stored transaction data for users."""
 from __future__ import annotations
 
-import json
+import asyncio
+import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 from loguru import logger
 
 TRANSACTIONS_DIR = Path(__file__).resolve().parent.parent / "data" / "transactions"
 
+# user_id -> (file signature, parsed payloads); reused while no file has changed
+_cache: Dict[int, Tuple[Tuple[Tuple[bytes, int], ...], Dict[str, Any]]] = {}
 
-def load_user_transactions(user_id: int) -> Dict[str, Any]:
-    """Load all stored transaction payloads for the given user."""
+
+def _scan_user_files(user_id: int) -> Tuple[List[Path], Tuple[Tuple[bytes, int], ...]]:
+    """
+    Return the user's transaction files plus a (name, mtime) signature.
+
+    A single scandir pass replaces the glob; the signature changes whenever a
+    file is added, removed or rewritten.
+    """
     if not TRANSACTIONS_DIR.exists():
         logger.debug("Transactions directory %s does not exist", TRANSACTIONS_DIR)
-        return {}
-
-    user_prefix = f"user_{user_id}_merchant_"
-    purchases: Dict[str, Any] = {}
-
-    for file_path in TRANSACTIONS_DIR.glob(f"{user_prefix}*.json"):
-        merchant_id = file_path.stem.split("_")[-1]
-        try:
-            with file_path.open("r", encoding="utf-8") as fh:
-                purchases[merchant_id] = json.load(fh)
-        except json.JSONDecodeError:
-            logger.warning(
-                "Skipping malformed transactions file for user %s: %s",
-                user_id,
-                file_path,
-            )
-        except Exception as exc:
-            logger.error(
-                "Unexpected error loading transactions file %s: %s",
-                file_path,
-                exc,
-            )
+        return [], ()
+
+    prefix = f"user_{user_id}_merchant_".encode()
+    with os.scandir(os.fsencode(TRANSACTIONS_DIR)) as it:
+        entries = sorted(
+            (e for e in it if e.name.startswith(prefix) and e.name.endswith(b".json")),
+            key=lambda e: e.name,
+        )
+
+    signature = tuple((e.name, e.stat().st_mtime_ns) for e in entries)
+    return [Path(os.fsdecode(e.path)) for e in entries], signature
+
+
+def _load_transactions_file(user_id: int, file_path: Path) -> Optional[Any]:
+    """Parse a single transactions file, returning None if it can't be read."""
+    try:
+        return orjson.loads(file_path.read_bytes())
+    except orjson.JSONDecodeError:
+        logger.warning(
+            "Skipping malformed transactions file for user %s: %s",
+            user_id,
+            file_path,
+        )
+    except Exception as exc:
+        logger.error(
+            "Unexpected error loading transactions file %s: %s",
+            file_path,
+            exc,
+        )
+    return None
+
 
+def _collect_payloads(paths: List[Path], payloads: List[Optional[Any]]) -> Dict[str, Any]:
+    """Key successfully parsed payloads by merchant id."""
+    return {
+        file_path.stem.split("_")[-1]: payload
+        for file_path, payload in zip(paths, payloads)
+        if payload is not None
+    }
+
+
+def load_user_transactions(user_id: int) -> Dict[str, Any]:
+    """Load all stored transaction payloads for the given user."""
+    paths, signature = _scan_user_files(user_id)
+    cached = _cache.get(user_id)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    purchases = _collect_payloads(paths, [_load_transactions_file(user_id, p) for p in paths])
+    _cache[user_id] = (signature, purchases)
     return purchases
 
+
+async def load_user_transactions_async(user_id: int) -> Dict[str, Any]:
+    """Load all stored transaction payloads concurrently, off the event loop."""
+    paths, signature = await asyncio.to_thread(_scan_user_files, user_id)
+    cached = _cache.get(user_id)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    payloads = await asyncio.gather(
+        *(asyncio.to_thread(_load_transactions_file, user_id, p) for p in paths)
+    )
+    purchases = _collect_payloads(paths, payloads)
+    _cache[user_id] = (signature, purchases)
+    return purchases
@@ -2,17 +2,48 @@
 from __future__ import annotations
 
 from datetime import datetime
-import json
+from functools import lru_cache
+import mmap
+import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 
 from fastapi import HTTPException, status
+import orjson
 
 from app.models import OnboardingStatus
 from app.utils.security import get_password_hash, verify_password
 
 
 STORE_PATH = Path(__file__).resolve().parent.parent / "data" / "users_store.json"
+# Append-only log of changes since the last snapshot in STORE_PATH
+LOG_PATH = STORE_PATH.with_suffix(".log")
+
+# Fold the log into a new snapshot once it outgrows the store
+_COMPACT_MIN_ENTRIES = 100
+_COMPACT_ENTRIES_PER_USER = 10
+
+_loads = orjson.loads
+
+
+class _StoreCache(NamedTuple):
+    """Parsed store plus lookup indexes, valid while the files on disk are unchanged."""
+
+    # (snapshot st_mtime_ns, log st_size)
+    stamp: Tuple[int, int]
+    data: Dict[str, Any]
+    by_email: Dict[str, Dict[str, Any]]
+    by_id: Dict[int, Dict[str, Any]]
+    log_entries: int = 0
+
+
+_CACHE: Optional[_StoreCache] = None
+_LOCK = threading.RLock()
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
 
 
 def _ensure_store_path() -> None:
@@ -20,9 +51,20 @@ def _ensure_store_path() -> None:
     STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _now_iso() -> str:
+    """Current UTC time in the naive ISO format already used by stored records."""
+    return datetime.utcnow().isoformat()
+
+
+@lru_cache(maxsize=None)
+def _default_password_hash(password: str) -> str:
+    """Hash a seed password once per process; hashing is deliberately slow."""
+    return get_password_hash(password)
+
+
 def _default_users() -> Dict[str, Any]:
     """Return the default seeded users for the store."""
-    now = datetime.utcnow().isoformat()
+    now = _now_iso()
     return {
         "next_id": 4,
         "users": [
@@ -30,7 +72,7 @@ def _default_users() -> Dict[str, Any]:
                 "id": 1,
                 "name": "Alice Demo",
                 "email": "alice@demo.com",
-                "hashed_password": get_password_hash("password123"),
+                "hashed_password": _default_password_hash("password123"),
                 "onboarding_status": OnboardingStatus.COMPLETE.value,
                 "preferences": {"theme": "dark", "notifications": True},
                 "created_at": now,
@@ -40,7 +82,7 @@ def _default_users() -> Dict[str, Any]:
                 "id": 2,
                 "name": "Bob Test",
                 "email": "bob@test.com",
-                "hashed_password": get_password_hash("password123"),
+                "hashed_password": _default_password_hash("password123"),
                 "onboarding_status": OnboardingStatus.COMPLETE.value,
                 "preferences": {"theme": "light", "notifications": False},
                 "created_at": now,
@@ -50,7 +92,7 @@ def _default_users() -> Dict[str, Any]:
                 "id": 3,
                 "name": "Demo User",
                 "email": "demo@example.com",
-                "hashed_password": get_password_hash("demo123"),
+                "hashed_password": _default_password_hash("demo123"),
                 "onboarding_status": OnboardingStatus.INCOMPLETE.value,
                 "preferences": {},
                 "created_at": now,
@@ -60,30 +102,168 @@ def _default_users() -> Dict[str, Any]:
     }
 
 
-def _load_store() -> Dict[str, Any]:
-    """Load the JSON store from disk, seeding defaults if missing."""
-    _ensure_store_path()
+def _index(stamp: Tuple[int, int], data: Dict[str, Any]) -> _StoreCache:
+    """Build the email and id indexes for a freshly loaded store."""
+    users = data["users"]
+    return _StoreCache(
+        stamp,
+        data,
+        {_normalize_email(u["email"]): u for u in users},
+        {u["id"]: u for u in users},
+    )
+
+
+def _stamp() -> Tuple[int, int]:
+    """Return the current (snapshot mtime, log size); raises if there is no snapshot."""
+    mtime_ns = STORE_PATH.stat().st_mtime_ns
+    try:
+        log_size = LOG_PATH.stat().st_size
+    except FileNotFoundError:
+        log_size = 0
+    return mtime_ns, log_size
+
+
+def _apply(cache: _StoreCache, entry: Dict[str, Any]) -> None:
+    """Apply one log entry to the cached store and its indexes.
+
+    Entries already reflected in the snapshot (left behind by an interrupted
+    compaction) are harmless: creates for known ids are skipped and updates
+    just set the same fields again.
+    """
+    store = cache.data
+    if entry["op"] == "create":
+        user = entry["user"]
+        if user["id"] in cache.by_id:
+            return
+        store["users"].append(user)
+        store["next_id"] = max(store["next_id"], user["id"] + 1)
+        cache.by_email[_normalize_email(user["email"])] = user
+        cache.by_id[user["id"]] = user
+    elif entry["op"] == "update":
+        user = cache.by_id.get(entry["id"])
+        if user is None:
+            return
+        old_email = _normalize_email(user["email"])
+        user.update(entry["fields"])
+        new_email = _normalize_email(user["email"])
+        if new_email != old_email:
+            cache.by_email.pop(old_email, None)
+            cache.by_email[new_email] = user
+
+
+def _read_snapshot() -> Dict[str, Any]:
+    """Parse STORE_PATH straight from a read-only mmap instead of copying it into bytes first."""
+    with open(STORE_PATH, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            # mmap can't map an empty file; let the decoder report it
+            return _loads(b"")
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return _loads(view)
 
-    if not STORE_PATH.exists():
-        data = _default_users()
-        _write_store(data)
-        return data
 
+def _replay_log(cache: _StoreCache) -> Tuple[int, bool]:
+    """Replay LOG_PATH onto a freshly loaded snapshot.
+
+    Returns the number of entries applied and whether the log ended in a
+    partial line (a crash mid-append), which the caller compacts away.
+    """
     try:
-        with STORE_PATH.open("r", encoding="utf-8") as fh:
-            return json.load(fh)
-    except json.JSONDecodeError:
-        # Corrupted store, recreate with defaults
-        data = _default_users()
-        _write_store(data)
-        return data
+        raw = LOG_PATH.read_bytes()
+    except FileNotFoundError:
+        return 0, False
+
+    *lines, tail = raw.split(b"\n")
+    for line_no, line in enumerate(lines, start=1):
+        try:
+            entry = _loads(line)
+        except orjson.JSONDecodeError as exc:
+            raise RuntimeError(f"User store log {LOG_PATH} is corrupt at line {line_no}") from exc
+        _apply(cache, entry)
+    return len(lines), bool(tail)
+
+
+def _get_cache() -> _StoreCache:
+    """Return the cached store, re-reading it when the files have changed."""
+    global _CACHE
+    with _LOCK:
+        _ensure_store_path()
+
+        try:
+            stamp = _stamp()
+        except FileNotFoundError:
+            _write_store(_default_users())
+            return _CACHE
+
+        if _CACHE is not None and _CACHE.stamp == stamp:
+            return _CACHE
+
+        try:
+            data = _read_snapshot()
+        except orjson.JSONDecodeError as exc:
+            # Writes are atomic, so this is a hand edit gone wrong; don't reseed over real users
+            raise RuntimeError(f"User store {STORE_PATH} is not valid JSON") from exc
+
+        cache = _index(stamp, data)
+        entries, torn = _replay_log(cache)
+        _CACHE = cache._replace(log_entries=entries)
+        if torn:
+            _write_store(data)
+        return _CACHE
+
+
+def _load_store() -> Dict[str, Any]:
+    """Load the JSON store, seeding defaults if missing.
+
+    The parsed store is cached in memory and only re-read when the snapshot or
+    its log changes.
+    """
+    return _get_cache().data
 
 
 def _write_store(data: Dict[str, Any]) -> None:
-    """Persist store to disk."""
-    _ensure_store_path()
-    with STORE_PATH.open("w", encoding="utf-8") as fh:
-        json.dump(data, fh, ensure_ascii=True, indent=2)
+    """Atomically write a full snapshot, drop the log, and refresh the cache."""
+    global _CACHE
+    with _LOCK:
+        _ensure_store_path()
+        tmp_path = STORE_PATH.with_suffix(f"{STORE_PATH.suffix}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as fh:
+                fh.write(_dumps(data))
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, STORE_PATH)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        # The snapshot now covers everything the log recorded
+        LOG_PATH.unlink(missing_ok=True)
+        stamp = _stamp()
+        if _CACHE is not None and _CACHE.data is data:
+            # Indexes were kept in sync by the caller
+            _CACHE = _CACHE._replace(stamp=stamp, log_entries=0)
+        else:
+            _CACHE = _index(stamp, data)
+
+
+def _append_entry(entry: Dict[str, Any]) -> None:
+    """Durably append one change to the log and apply it to the cache.
+
+    A write costs one appended line instead of rewriting the whole store; the
+    log is compacted into a fresh snapshot once it grows past its threshold.
+    """
+    global _CACHE
+    with _LOCK:
+        cache = _get_cache()
+        with open(LOG_PATH, "ab") as fh:
+            fh.write(orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        _apply(cache, entry)
+        _CACHE = cache._replace(stamp=_stamp(), log_entries=cache.log_entries + 1)
+
+        threshold = max(_COMPACT_MIN_ENTRIES, _COMPACT_ENTRIES_PER_USER * len(cache.by_id))
+        if _CACHE.log_entries > threshold:
+            _write_store(cache.data)
 
 
 def _normalize_email(email: str) -> str:
@@ -92,44 +272,42 @@ def _normalize_email(email: str) -> str:
 
 def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
     """Retrieve a stored user by email."""
-    store = _load_store()
-    norm_email = _normalize_email(email)
-    return next((u for u in store["users"] if _normalize_email(u["email"]) == norm_email), None)
+    return _get_cache().by_email.get(_normalize_email(email))
 
 
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     """Retrieve a stored user by ID."""
-    store = _load_store()
-    return next((u for u in store["users"] if u["id"] == user_id), None)
+    return _get_cache().by_id.get(user_id)
 
 
 def create_user(name: str, email: str, password: str) -> Dict[str, Any]:
     """Create and persist a new user record."""
-    store = _load_store()
-    if get_user_by_email(email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
-
-    norm_email = _normalize_email(email)
-    now = datetime.utcnow().isoformat()
-
-    new_user = {
-        "id": store["next_id"],
-        "name": name,
-        "email": norm_email,
-        "hashed_password": get_password_hash(password),
-        "onboarding_status": OnboardingStatus.INCOMPLETE.value,
-        "preferences": {},
-        "created_at": now,
-        "updated_at": now,
-    }
+    hashed_password = get_password_hash(password)
+    with _LOCK:
+        cache = _get_cache()
+        store = cache.data
+        norm_email = _normalize_email(email)
+        if norm_email in cache.by_email:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered",
+            )
 
-    store["users"].append(new_user)
-    store["next_id"] += 1
-    _write_store(store)
-    return new_user
+        now = _now_iso()
+
+        new_user = {
+            "id": store["next_id"],
+            "name": name,
+            "email": norm_email,
+            "hashed_password": hashed_password,
+            "onboarding_status": OnboardingStatus.INCOMPLETE.value,
+            "preferences": {},
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        _append_entry({"op": "create", "user": new_user})
+        return new_user
 
 
 def authenticate_user(email: str, password: str) -> Optional[Dict[str, Any]]:
@@ -142,13 +320,11 @@ def authenticate_user(email: str, password: str) -> Optional[Dict[str, Any]]:
 
 def update_user(user_id: int, **updates: Any) -> Optional[Dict[str, Any]]:
     """Update a stored user and persist changes."""
-    store = _load_store()
-    for idx, user in enumerate(store["users"]):
-        if user["id"] == user_id:
-            user.update(updates)
-            user["updated_at"] = datetime.utcnow().isoformat()
-            store["users"][idx] = user
-            _write_store(store)
-            return user
-    return None
+    with _LOCK:
+        user = _get_cache().by_id.get(user_id)
+        if user is None:
+            return None
+
+        _append_entry({"op": "update", "id": user_id, "fields": {**updates, "updated_at": _now_iso()}})
+        return user
 
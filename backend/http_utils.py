@@ -0,0 +1,35 @@
+"""Shared keep-alive HTTP clients for the backend's local test scripts."""
+import atexit
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+
+BASE_URL = "http://localhost:8000"
+
+LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=30)
+TIMEOUT = httpx.Timeout(5.0)
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+@lru_cache(maxsize=1)
+def get_client() -> httpx.Client:
+    """Return the process-wide sync client; it is closed at interpreter exit."""
+    client = httpx.Client(base_url=BASE_URL, limits=LIMITS, timeout=TIMEOUT)
+    atexit.register(client.close)
+    return client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide async client.
+
+    An AsyncClient can't be closed from atexit once its event loop is gone, so
+    the caller that drives the loop owns it (``async with get_async_client()``);
+    a fresh client is created if the previous one has been closed.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(base_url=BASE_URL, limits=LIMITS, timeout=TIMEOUT)
+    return _async_client
@@ -1,7 +1,9 @@
 """Seed script to populate database with demo data."""
 from datetime import datetime
+from functools import lru_cache
 
 from passlib.context import CryptContext
+from sqlalchemy import text
 
 from app.models import (
     User,
@@ -21,11 +23,23 @@ from app.models import (
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+@lru_cache(maxsize=8)
+def _hash(password: str) -> str:
+    """Hash a demo password once per process; bcrypt is deliberately slow."""
+    return pwd_context.hash(password)
+
+
 def seed_database() -> None:
     """Seed the database with demo data."""
     db = SessionLocal()
 
     try:
+        # Databases created before the model declared this index won't have it yet
+        db.execute(
+            text("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email_lower ON users (lower(email))")
+        )
+        db.commit()
+
         # Check if data already exists
         if db.query(User).count() > 0:
             print("Database already seeded. Skipping...")
@@ -33,31 +47,35 @@ def seed_database() -> None:
 
         print("Seeding database...")
 
+        # The demo users share one password
+        demo_password_hash = _hash("password123")
+
         # Create demo users
         user1 = User(
             name="Alice Demo",
             email="alice@demo.com",
-            hashed_password=pwd_context.hash("password123"),
+            hashed_password=demo_password_hash,
             onboarding_status=OnboardingStatus.COMPLETE,
             preferences={"notifications": True, "theme": "dark"},
         )
         user2 = User(
             name="Bob Test",
             email="bob@test.com",
-            hashed_password=pwd_context.hash("password123"),
+            hashed_password=demo_password_hash,
             onboarding_status=OnboardingStatus.COMPLETE,
             preferences={"notifications": False, "theme": "light"},
         )
         user3 = User(
             name="Charlie Sample",
             email="charlie@sample.com",
-            hashed_password=pwd_context.hash("password123"),
+            hashed_password=demo_password_hash,
             onboarding_status=OnboardingStatus.INCOMPLETE,
             preferences={},
         )
 
         db.add_all([user1, user2, user3])
-        db.commit()
+        # Flush (not commit) to get autoincrement IDs; everything commits once at the end
+        db.flush()
         print(f"✓ Created {3} demo users")
 
         # Create solo chat for Alice
@@ -67,7 +85,7 @@ def seed_database() -> None:
             title="Personal Assistant",
         )
         db.add(solo_chat)
-        db.commit()
+        db.flush()
 
         # Add Alice as member
         solo_member = ChatMember(
@@ -76,7 +94,6 @@ def seed_database() -> None:
             role=ChatMemberRole.OWNER,
         )
         db.add(solo_member)
-        db.commit()
 
         # Add some messages
         msg1 = Message(
@@ -104,7 +121,6 @@ def seed_database() -> None:
             },
         )
         db.add_all([msg1, msg2])
-        db.commit()
         print(f"✓ Created solo chat with {2} messages")
 
         # Create group chat
@@ -114,7 +130,7 @@ def seed_database() -> None:
             title="Weekend Trip Planning",
         )
         db.add(group_chat)
-        db.commit()
+        db.flush()
 
         # Add group members
         group_member1 = ChatMember(
@@ -128,7 +144,6 @@ def seed_database() -> None:
             role=ChatMemberRole.MEMBER,
         )
         db.add_all([group_member1, group_member2])
-        db.commit()
 
         # Create group context
         group_context = GroupContext(
@@ -138,7 +153,6 @@ def seed_database() -> None:
             last_activity_at=datetime.utcnow(),
         )
         db.add(group_context)
-        db.commit()
 
         # Add group messages
         group_msg1 = Message(
@@ -161,7 +175,6 @@ def seed_database() -> None:
             },
         )
         db.add_all([group_msg1, group_msg2])
-        db.commit()
         print(f"✓ Created group chat with {2} messages")
 
         # Create linked accounts
@@ -187,9 +200,10 @@ def seed_database() -> None:
             knot_item_id="knot_demo_ubereats_789",
         )
         db.add_all([account1, account2, account3])
-        db.commit()
         print(f"✓ Created {3} linked accounts")
 
+        db.commit()
+
         print("\n✅ Database seeded successfully!")
         print("\nDemo credentials:")
         print("  Email: alice@demo.com")
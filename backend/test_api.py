@@ -1,106 +1,142 @@
 """Test script for all API endpoints."""
+import asyncio
+
 import httpx
+import orjson
+
+from http_utils import get_async_client
 
-BASE_URL = "http://localhost:8000"
+# Logged in once per process; password verification is deliberately slow
+_token = None
 
 
-def get_token():
-    """Get authentication token."""
-    login_data = {"email": "alice@demo.com", "password": "password123"}
-    response = httpx.post(f"{BASE_URL}/api/auth/login", json=login_data, timeout=5.0)
+async def get_token(client: httpx.AsyncClient):
+    """Get authentication token, reusing it after the first successful login."""
+    global _token
+    if _token is None:
+        login_data = {"email": "alice@demo.com", "password": "password123"}
+        response = await client.post("/api/auth/login", json=login_data)
+        if response.status_code == 200:
+            _token = orjson.loads(response.content)["access_token"]
+    return _token
+
+
+def _ok_json(response):
+    """Return the decoded body of a 200 response, None otherwise (or on a failed request)."""
+    if isinstance(response, Exception):
+        raise response
     if response.status_code == 200:
-        return response.json()["access_token"]
+        return orjson.loads(response.content)
     return None
 
 
-def test_all_endpoints():
+async def test_all_endpoints():
     """Test all API endpoints."""
     print("🧪 Testing All API Endpoints...\n")
-    
-    # Get token
-    print("🔑 Getting authentication token...")
-    token = get_token()
-    if not token:
-        print("❌ Failed to get token. Make sure server is running.")
-        return
-    
-    headers = {"Authorization": f"Bearer {token}"}
-    print(f"✅ Token obtained: {token[:20]}...\n")
-    
+
+    async with get_async_client() as client:
+        # Get token
+        print("🔑 Getting authentication token...")
+        try:
+            token = await get_token(client)
+        except httpx.HTTPError:
+            token = None
+        if not token:
+            print("❌ Failed to get token. Make sure server is running.")
+            return
+
+        client.headers["Authorization"] = f"Bearer {token}"
+        print(f"✅ Token obtained: {token[:20]}...\n")
+
+        # The GETs are independent, so issue them together over the pooled connection
+        (
+            chats_resp,
+            chat_resp,
+            groups_resp,
+            group_resp,
+            accounts_resp,
+            status_resp,
+            insights_resp,
+            summary_resp,
+            settings_resp,
+        ) = await asyncio.gather(
+            client.get("/api/chats"),
+            client.get("/api/chats/1"),
+            client.get("/api/groups"),
+            client.get("/api/groups/2"),
+            client.get("/api/accounts"),
+            client.get("/api/accounts/status"),
+            client.get("/api/insights"),
+            client.get("/api/insights/summary"),
+            client.get("/api/settings"),
+            return_exceptions=True,
+        )
+
     # Test chats
     print("💬 Testing Chats API...")
     try:
-        response = httpx.get(f"{BASE_URL}/api/chats", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            chats = response.json()
+        chats = _ok_json(chats_resp)
+        if chats is not None:
             print(f"   ✅ GET /api/chats: {len(chats)} chats returned")
-        
+
         # Get specific chat
-        response = httpx.get(f"{BASE_URL}/api/chats/1", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            chat = response.json()
+        chat = _ok_json(chat_resp)
+        if chat is not None:
             print(f"   ✅ GET /api/chats/1: {len(chat.get('messages', []))} messages")
     except Exception as e:
         print(f"   ❌ Chats API failed: {e}")
-    
+
     # Test groups
     print("\n👥 Testing Groups API...")
     try:
-        response = httpx.get(f"{BASE_URL}/api/groups", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            groups = response.json()
+        groups = _ok_json(groups_resp)
+        if groups is not None:
             print(f"   ✅ GET /api/groups: {len(groups)} groups returned")
-        
+
         # Get specific group
-        response = httpx.get(f"{BASE_URL}/api/groups/2", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            group = response.json()
+        group = _ok_json(group_resp)
+        if group is not None:
             print(f"   ✅ GET /api/groups/2: {group.get('name')}")
     except Exception as e:
         print(f"   ❌ Groups API failed: {e}")
-    
+
     # Test accounts
     print("\n💳 Testing Accounts API...")
     try:
-        response = httpx.get(f"{BASE_URL}/api/accounts", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            data = response.json()
+        data = _ok_json(accounts_resp)
+        if data is not None:
             print(f"   ✅ GET /api/accounts: {data.get('total')} accounts")
-        
-        response = httpx.get(f"{BASE_URL}/api/accounts/status", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            status_data = response.json()
+
+        status_data = _ok_json(status_resp)
+        if status_data is not None:
             print(f"   ✅ GET /api/accounts/status: {status_data.get('connected')}")
     except Exception as e:
         print(f"   ❌ Accounts API failed: {e}")
-    
+
     # Test insights
     print("\n📊 Testing Insights API...")
     try:
-        response = httpx.get(f"{BASE_URL}/api/insights", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            insights = response.json()
+        insights = _ok_json(insights_resp)
+        if insights is not None:
             print(f"   ✅ GET /api/insights: {len(insights.get('cards', []))} card insights")
             print(f"                        {len(insights.get('trends', []))} spending trends")
-        
-        response = httpx.get(f"{BASE_URL}/api/insights/summary", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            summary = response.json()
+
+        summary = _ok_json(summary_resp)
+        if summary is not None:
             print(f"   ✅ GET /api/insights/summary: {summary.get('month')}")
     except Exception as e:
         print(f"   ❌ Insights API failed: {e}")
-    
+
     # Test settings
     print("\n⚙️  Testing Settings API...")
     try:
-        response = httpx.get(f"{BASE_URL}/api/settings", headers=headers, timeout=5.0)
-        if response.status_code == 200:
-            settings_data = response.json()
+        settings_data = _ok_json(settings_resp)
+        if settings_data is not None:
             print(f"   ✅ GET /api/settings: {settings_data.get('account', {}).get('name')}")
             print(f"                        Theme: {settings_data.get('preferences', {}).get('display', {}).get('theme')}")
     except Exception as e:
         print(f"   ❌ Settings API failed: {e}")
-    
+
     print("\n✅ All endpoint tests complete!")
     print("\n📖 Visit http://localhost:8000/docs to explore the API interactively")
 
@@ -108,5 +144,5 @@ def test_all_endpoints():
 if __name__ == "__main__":
     print("Make sure the server is running: make dev")
     print("=" * 60)
-    test_all_endpoints()
+    asyncio.run(test_all_endpoints())
 
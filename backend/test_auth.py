@@ -1,12 +1,13 @@
 """Quick test script to verify authentication works."""
-import httpx
+import orjson
 
-BASE_URL = "http://localhost:8000"
+from http_utils import get_client
 
 
 def test_auth_flow():
     """Test the complete authentication flow."""
     print("🧪 Testing Authentication Flow...\n")
+    client = get_client()
     
     # Test 1: Signup
     print("1️⃣ Testing Signup...")
@@ -17,14 +18,14 @@ def test_auth_flow():
     }
     
     try:
-        response = httpx.post(f"{BASE_URL}/api/auth/signup", json=signup_data, timeout=5.0)
+        response = client.post("/api/auth/signup", json=signup_data)
         if response.status_code == 201:
-            token_data = response.json()
+            token_data = orjson.loads(response.content)
             access_token = token_data["access_token"]
             print(f"   ✅ Signup successful! Token: {access_token[:20]}...")
         else:
             print(f"   ⚠️  Signup returned: {response.status_code}")
-            print(f"   Response: {response.json()}")
+            print(f"   Response: {orjson.loads(response.content)}")
     except Exception as e:
         print(f"   ❌ Signup failed: {e}")
         return
@@ -37,9 +38,9 @@ def test_auth_flow():
     }
     
     try:
-        response = httpx.post(f"{BASE_URL}/api/auth/login", json=login_data, timeout=5.0)
+        response = client.post("/api/auth/login", json=login_data)
         if response.status_code == 200:
-            token_data = response.json()
+            token_data = orjson.loads(response.content)
             demo_token = token_data["access_token"]
             print(f"   ✅ Login successful! Token: {demo_token[:20]}...")
         else:
@@ -55,9 +56,9 @@ def test_auth_flow():
         headers = {"Authorization": f"Bearer {demo_token}"}
         
         try:
-            response = httpx.get(f"{BASE_URL}/api/auth/session", headers=headers, timeout=5.0)
+            response = client.get("/api/auth/session", headers=headers)
             if response.status_code == 200:
-                session_data = response.json()
+                session_data = orjson.loads(response.content)
                 print(f"   ✅ Session retrieved!")
                 print(f"   User: {session_data['user']['name']} ({session_data['user']['email']})")
                 print(f"   Authenticated: {session_data['authenticated']}")
@@ -72,9 +73,9 @@ def test_auth_flow():
         headers = {"Authorization": f"Bearer {demo_token}"}
         
         try:
-            response = httpx.get(f"{BASE_URL}/api/auth/me", headers=headers, timeout=5.0)
+            response = client.get("/api/auth/me", headers=headers)
             if response.status_code == 200:
-                user_data = response.json()
+                user_data = orjson.loads(response.content)
                 print(f"   ✅ User info retrieved!")
                 print(f"   ID: {user_data['id']}")
                 print(f"   Name: {user_data['name']}")
@@ -91,7 +92,7 @@ def test_auth_flow():
         headers = {"Authorization": f"Bearer {demo_token}"}
         
         try:
-            response = httpx.post(f"{BASE_URL}/api/auth/logout", headers=headers, timeout=5.0)
+            response = client.post("/api/auth/logout", headers=headers)
             if response.status_code == 200:
                 print(f"   ✅ Logout successful!")
             else:
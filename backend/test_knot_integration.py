@@ -4,9 +4,15 @@ Run this to verify the Knot integration is working
 """
 import asyncio
 import sys
+
+import orjson
+
 from app.integrations.knot import KnotClient, KnotAPIError
 from app.config.settings import settings
 
+# Logged in once per process; password verification is deliberately slow
+_token = None
+
 
 async def test_mock_mode():
     """Test that mock mode works (no credentials needed)"""
@@ -70,85 +76,89 @@ async def test_with_credentials():
 
 async def test_api_endpoints():
     """Test the FastAPI endpoints"""
+    global _token
     print("\n🧪 Test 3: FastAPI Endpoints")
     print("=" * 50)
     
     try:
-        from fastapi.testclient import TestClient
+        import httpx
         from app.main import app
-        
-        client = TestClient(app)
-        
-        # Test login first
-        print("📋 Testing login...")
-        login_response = client.post(
-            "/api/auth/login",
-            json={"email": "alice@demo.com", "password": "password123"}
-        )
-        
-        if login_response.status_code != 200:
-            print(f"❌ Login failed: {login_response.status_code}")
-            return False
-        
-        token = login_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {token}"}
-        print("✅ Login successful")
-        
-        # Test onboarding start
-        print("\n📋 Testing POST /api/onboarding/start...")
-        start_response = client.post(
-            "/api/onboarding/start",
-            json={"email": "alice@demo.com"},
-            headers=headers
-        )
-        
-        if start_response.status_code != 200:
-            print(f"❌ Onboarding start failed: {start_response.status_code}")
-            print(f"   Response: {start_response.text}")
-            return False
-        
-        start_data = start_response.json()
-        print("✅ Onboarding start successful")
-        print(f"   Session ID: {start_data['session_id']}")
-        print(f"   Sandbox mode: {start_data['sandbox_mode']}")
-        
-        # Test onboarding complete
-        print("\n📋 Testing POST /api/onboarding/complete...")
-        complete_response = client.post(
-            "/api/onboarding/complete",
-            json={"session_id": start_data['session_id']},
-            headers=headers
-        )
-        
-        if complete_response.status_code != 200:
-            print(f"❌ Onboarding complete failed: {complete_response.status_code}")
-            return False
-        
-        complete_data = complete_response.json()
-        print("✅ Onboarding complete successful")
-        print(f"   Accounts linked: {complete_data['accounts_linked']}")
-        
-        # Test accounts endpoint
-        print("\n📋 Testing GET /api/accounts...")
-        accounts_response = client.get("/api/accounts", headers=headers)
-        
-        if accounts_response.status_code != 200:
-            print(f"❌ Get accounts failed: {accounts_response.status_code}")
-            return False
-        
-        accounts_data = accounts_response.json()
-        print("✅ Get accounts successful")
-        print(f"   Total accounts: {accounts_data['total']}")
-        print(f"   Sandbox mode: {accounts_data['sandbox_mode']}")
-        
-        if accounts_data['accounts']:
-            print(f"   Sample: {accounts_data['accounts'][0]['institution']}")
-        
-        return True
+
+        # Drive the ASGI app directly on this event loop (no TestClient thread bridge)
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=True)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Test login first
+            if _token is None:
+                print("📋 Testing login...")
+                login_response = await client.post(
+                    "/api/auth/login",
+                    json={"email": "alice@demo.com", "password": "password123"}
+                )
+
+                if login_response.status_code != 200:
+                    print(f"❌ Login failed: {login_response.status_code}")
+                    return False
+
+                _token = orjson.loads(login_response.content)["access_token"]
+                print("✅ Login successful")
+
+            headers = {"Authorization": f"Bearer {_token}"}
+        
+            # Test onboarding start
+            print("\n📋 Testing POST /api/onboarding/start...")
+            start_response = await client.post(
+                "/api/onboarding/start",
+                json={"email": "alice@demo.com"},
+                headers=headers
+            )
+        
+            if start_response.status_code != 200:
+                print(f"❌ Onboarding start failed: {start_response.status_code}")
+                print(f"   Response: {start_response.text}")
+                return False
+        
+            start_data = orjson.loads(start_response.content)
+            print("✅ Onboarding start successful")
+            print(f"   Session ID: {start_data['session_id']}")
+            print(f"   Sandbox mode: {start_data['sandbox_mode']}")
+        
+            # Test onboarding complete
+            print("\n📋 Testing POST /api/onboarding/complete...")
+            complete_response = await client.post(
+                "/api/onboarding/complete",
+                json={"session_id": start_data['session_id']},
+                headers=headers
+            )
+        
+            if complete_response.status_code != 200:
+                print(f"❌ Onboarding complete failed: {complete_response.status_code}")
+                return False
+        
+            complete_data = orjson.loads(complete_response.content)
+            print("✅ Onboarding complete successful")
+            print(f"   Accounts linked: {complete_data['accounts_linked']}")
+        
+            # Test accounts endpoint
+            print("\n📋 Testing GET /api/accounts...")
+            accounts_response = await client.get("/api/accounts", headers=headers)
+        
+            if accounts_response.status_code != 200:
+                print(f"❌ Get accounts failed: {accounts_response.status_code}")
+                return False
+        
+            accounts_data = orjson.loads(accounts_response.content)
+            print("✅ Get accounts successful")
+            print(f"   Total accounts: {accounts_data['total']}")
+            print(f"   Sandbox mode: {accounts_data['sandbox_mode']}")
+        
+            if accounts_data['accounts']:
+                print(f"   Sample: {accounts_data['accounts'][0]['institution']}")
+        
+            return True
         
     except ImportError:
-        print("⚠️  fastapi.testclient not installed")
-        print("   Run: poetry add --dev fastapi[all]")
+        print("⚠️  httpx not installed")
+        print("   Run: poetry install")
         return True
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -192,6 +202,14 @@ async def main():
 
 
 if __name__ == "__main__":
+    # uvloop ships with uvicorn[standard] on POSIX; fall back to the default loop elsewhere
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     exit_code = asyncio.run(main())
     sys.exit(exit_code)
 
@@ -1,118 +1,158 @@
 """Test script for write API endpoints."""
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Optional
+
 import httpx
+import orjson
+from jose import JWTError, jwt
+
+from http_utils import BASE_URL, get_async_client
+
+LOGIN_DATA = {"email": "alice@demo.com", "password": "password123"}
+
+# Tokens are reused across runs until shortly before they expire
+TOKEN_CACHE_PATH = Path.home() / ".cache" / "lattice" / "token.json"
 
-BASE_URL = "http://localhost:8000"
 
+def _load_cached_token() -> Optional[str]:
+    """Return a still-valid cached token for this server and user, if any."""
+    try:
+        cached = orjson.loads(TOKEN_CACHE_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+    if (
+        cached.get("base_url") == BASE_URL
+        and cached.get("email") == LOGIN_DATA["email"]
+        and cached.get("exp", 0) > time.time() + 30
+    ):
+        return cached.get("token")
+    return None
+
+
+def _store_cached_token(token: str) -> None:
+    """Cache a token until its own exp claim (or an hour if it has none)."""
+    try:
+        exp = jwt.get_unverified_claims(token)["exp"]
+    except (JWTError, KeyError):
+        exp = time.time() + 3600
+
+    try:
+        TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        TOKEN_CACHE_PATH.write_bytes(
+            orjson.dumps({"base_url": BASE_URL, "email": LOGIN_DATA["email"], "token": token, "exp": exp})
+        )
+    except OSError:
+        pass
 
-def get_token():
-    """Get authentication token."""
-    login_data = {"email": "alice@demo.com", "password": "password123"}
-    response = httpx.post(f"{BASE_URL}/api/auth/login", json=login_data, timeout=5.0)
+
+def _clear_cached_token() -> None:
+    TOKEN_CACHE_PATH.unlink(missing_ok=True)
+
+
+async def get_token(client: httpx.AsyncClient, use_cache: bool = True):
+    """Get authentication token, preferring one cached by an earlier run."""
+    if use_cache:
+        token = _load_cached_token()
+        if token:
+            return token
+
+    response = await client.post("/api/auth/login", json=LOGIN_DATA)
     if response.status_code == 200:
-        return response.json()["access_token"]
+        token = orjson.loads(response.content)["access_token"]
+        _store_cached_token(token)
+        return token
     return None
 
 
-def test_write_endpoints():
-    """Test all write API endpoints."""
-    print("🧪 Testing Write API Endpoints...\n")
-    
-    # Get token
-    print("🔑 Getting authentication token...")
-    token = get_token()
-    if not token:
-        print("❌ Failed to get token. Make sure server is running.")
-        return
-    
-    headers = {"Authorization": f"Bearer {token}"}
-    print(f"✅ Token obtained\n")
-    
-    # Test 1: POST message
-    print("📝 Testing POST /api/chats/{chat_id}/messages...")
+# The checks below run concurrently, so each collects its output lines and the
+# caller prints them section by section once everything has finished.
+
+
+async def _check_post_message(client: httpx.AsyncClient) -> List[str]:
+    """Test 1: POST message."""
+    lines = ["📝 Testing POST /api/chats/{chat_id}/messages..."]
     try:
         message_data = {
             "content": "What's the best card for dining out?",
             "sender_type": "user"
         }
-        response = httpx.post(
-            f"{BASE_URL}/api/chats/1/messages",
-            json=message_data,
-            headers=headers,
-            timeout=5.0
-        )
+        response = await client.post("/api/chats/1/messages", json=message_data)
         if response.status_code == 201:
-            message = response.json()
-            print(f"   ✅ Message created: ID {message['id']}")
-            print(f"   📨 Content: {message['content']}")
-            
+            message = orjson.loads(response.content)
+            lines.append(f"   ✅ Message created: ID {message['id']}")
+            lines.append(f"   📨 Content: {message['content']}")
+
             # Check if AI response was generated
-            chat_response = httpx.get(f"{BASE_URL}/api/chats/1", headers=headers, timeout=5.0)
+            chat_response = await client.get("/api/chats/1")
             if chat_response.status_code == 200:
-                chat = chat_response.json()
-                print(f"   🤖 Total messages in chat: {len(chat['messages'])}")
+                chat = orjson.loads(chat_response.content)
+                lines.append(f"   🤖 Total messages in chat: {len(chat['messages'])}")
         else:
-            print(f"   ⚠️  Returned: {response.status_code}")
+            lines.append(f"   ⚠️  Returned: {response.status_code}")
     except Exception as e:
-        print(f"   ❌ Failed: {e}")
-    
-    # Test 2: POST group
-    print("\n👥 Testing POST /api/groups...")
+        lines.append(f"   ❌ Failed: {e}")
+    return lines
+
+
+async def _check_post_group(client: httpx.AsyncClient) -> List[str]:
+    """Test 2: POST group."""
+    lines = ["\n👥 Testing POST /api/groups..."]
     try:
         group_data = {
             "name": "Test Vacation Group",
             "members": ["alice@demo.com", "bob@test.com", "friend@example.com"]
         }
-        response = httpx.post(
-            f"{BASE_URL}/api/groups",
-            json=group_data,
-            headers=headers,
-            timeout=5.0
-        )
+        response = await client.post("/api/groups", json=group_data)
         if response.status_code == 201:
-            group = response.json()
-            print(f"   ✅ Group created: {group['name']}")
-            print(f"   👤 Members: {len(group['members'])}")
-            print(f"   💰 Total spend: ${group['total_spend']}")
+            group = orjson.loads(response.content)
+            lines.append(f"   ✅ Group created: {group['name']}")
+            lines.append(f"   👤 Members: {len(group['members'])}")
+            lines.append(f"   💰 Total spend: ${group['total_spend']}")
         else:
-            print(f"   ⚠️  Returned: {response.status_code}")
+            lines.append(f"   ⚠️  Returned: {response.status_code}")
     except Exception as e:
-        print(f"   ❌ Failed: {e}")
-    
-    # Test 3: DELETE account
-    print("\n💳 Testing DELETE /api/accounts/{account_id}...")
+        lines.append(f"   ❌ Failed: {e}")
+    return lines
+
+
+async def _check_delete_account(client: httpx.AsyncClient) -> List[str]:
+    """Test 3: DELETE account."""
+    lines = ["\n💳 Testing DELETE /api/accounts/{account_id}..."]
     try:
         # Get current accounts first
-        accounts_response = httpx.get(f"{BASE_URL}/api/accounts", headers=headers, timeout=5.0)
+        accounts_response = await client.get("/api/accounts")
         if accounts_response.status_code == 200:
-            accounts_data = accounts_response.json()
+            accounts_data = orjson.loads(accounts_response.content)
             if accounts_data["accounts"]:
                 account_id = accounts_data["accounts"][0]["id"]
                 account_name = accounts_data["accounts"][0]["institution"]
-                
-                response = httpx.delete(
-                    f"{BASE_URL}/api/accounts/{account_id}",
-                    headers=headers,
-                    timeout=5.0
-                )
+
+                response = await client.delete(f"/api/accounts/{account_id}")
                 if response.status_code == 200:
-                    result = response.json()
-                    print(f"   ✅ Account deleted: {account_name}")
-                    print(f"   📋 Message: {result['message']}")
-                    
+                    result = orjson.loads(response.content)
+                    lines.append(f"   ✅ Account deleted: {account_name}")
+                    lines.append(f"   📋 Message: {result['message']}")
+
                     # Verify deletion
-                    verify_response = httpx.get(f"{BASE_URL}/api/accounts", headers=headers, timeout=5.0)
+                    verify_response = await client.get("/api/accounts")
                     if verify_response.status_code == 200:
-                        remaining = verify_response.json()
-                        print(f"   📊 Remaining accounts: {remaining['total']}")
+                        remaining = orjson.loads(verify_response.content)
+                        lines.append(f"   📊 Remaining accounts: {remaining['total']}")
                 else:
-                    print(f"   ⚠️  Returned: {response.status_code}")
+                    lines.append(f"   ⚠️  Returned: {response.status_code}")
             else:
-                print("   ℹ️  No accounts to delete")
+                lines.append("   ℹ️  No accounts to delete")
     except Exception as e:
-        print(f"   ❌ Failed: {e}")
-    
-    # Test 4: PATCH settings
-    print("\n⚙️  Testing PATCH /api/settings...")
+        lines.append(f"   ❌ Failed: {e}")
+    return lines
+
+
+async def _check_patch_settings(client: httpx.AsyncClient) -> List[str]:
+    """Test 4: PATCH settings."""
+    lines = ["\n⚙️  Testing PATCH /api/settings..."]
     try:
         settings_data = {
             "section": "preferences",
@@ -123,29 +163,75 @@ def test_write_endpoints():
                 }
             }
         }
-        response = httpx.patch(
-            f"{BASE_URL}/api/settings",
-            json=settings_data,
-            headers=headers,
-            timeout=5.0
-        )
+        response = await client.patch("/api/settings", json=settings_data)
         if response.status_code == 200:
-            result = response.json()
-            print(f"   ✅ Settings updated: {result['section']}")
-            print(f"   📝 Message: {result['message']}")
-            
+            result = orjson.loads(response.content)
+            lines.append(f"   ✅ Settings updated: {result['section']}")
+            lines.append(f"   📝 Message: {result['message']}")
+
             # Verify update
-            verify_response = httpx.get(f"{BASE_URL}/api/settings", headers=headers, timeout=5.0)
+            verify_response = await client.get("/api/settings")
             if verify_response.status_code == 200:
-                settings = verify_response.json()
+                settings = orjson.loads(verify_response.content)
                 notifications = settings["preferences"]["notifications"]
-                print(f"   📧 Email notifications: {notifications.get('email')}")
-                print(f"   📱 Push notifications: {notifications.get('push')}")
+                lines.append(f"   📧 Email notifications: {notifications.get('email')}")
+                lines.append(f"   📱 Push notifications: {notifications.get('push')}")
         else:
-            print(f"   ⚠️  Returned: {response.status_code}")
+            lines.append(f"   ⚠️  Returned: {response.status_code}")
     except Exception as e:
-        print(f"   ❌ Failed: {e}")
-    
+        lines.append(f"   ❌ Failed: {e}")
+    return lines
+
+
+async def test_write_endpoints():
+    """Test all write API endpoints."""
+    print("🧪 Testing Write API Endpoints...\n")
+
+    # One pooled client keeps connections alive across every request below
+    async with get_async_client() as client:
+        # Get token
+        print("🔑 Getting authentication token...")
+        try:
+            token = await get_token(client)
+        except httpx.HTTPError:
+            token = None
+        if not token:
+            print("❌ Failed to get token. Make sure server is running.")
+            return
+
+        print("✅ Token obtained\n")
+
+        unauthorized = False
+
+        async def _note_unauthorized(response: httpx.Response) -> None:
+            nonlocal unauthorized
+            unauthorized = unauthorized or response.status_code == 401
+
+        client.event_hooks["response"].append(_note_unauthorized)
+
+        for attempt in range(2):
+            client.headers["Authorization"] = f"Bearer {token}"
+            unauthorized = False
+
+            # The four checks touch unrelated resources, so run them side by side
+            sections = await asyncio.gather(
+                _check_post_message(client),
+                _check_post_group(client),
+                _check_delete_account(client),
+                _check_patch_settings(client),
+            )
+            if not unauthorized or attempt:
+                break
+
+            # A cached token was rejected (e.g. the server's secret changed); log in again once
+            _clear_cached_token()
+            token = await get_token(client, use_cache=False)
+            if not token:
+                break
+
+    for lines in sections:
+        print("\n".join(lines))
+
     print("\n✅ All write endpoint tests complete!")
     print("\n📖 Visit http://localhost:8000/docs to try the API interactively")
 
@@ -153,5 +239,4 @@ def test_write_endpoints():
 if __name__ == "__main__":
     print("Make sure the server is running: make dev")
     print("=" * 60)
-    test_write_endpoints()
-
+    asyncio.run(test_write_endpoints())
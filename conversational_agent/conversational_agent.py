@@ -1,15 +1,21 @@
 """Conversational companion agent."""
 from __future__ import annotations
 
-import asyncio
-import json
-import os
 from typing import Any, Sequence
 
-from dedalus_labs import AsyncDedalus, DedalusRunner
-from dotenv import load_dotenv
+import orjson
 from loguru import logger
 
+from agent_runtime import api_key, get_runner, run_sync
+
+__all__ = [
+    "CONTEXT_TEMPLATE",
+    "PROMPT_TEMPLATE",
+    "run_conversational_agent",
+    "run_conversational_agent_sync",
+]
+
+
 PROMPT_TEMPLATE = """
 You are Lattice — a warm, conversational front-door for a personal finance co-pilot.
 Your job is simple: greet people, keep the chat friendly, and gently steer toward money topics you can help with. Answer basic, generic prompts (e.g., “hi”, “how are you?”, “what do you do?”) and simple questions about Lattice, but don’t take on tasks outside finance or beyond lightweight chit-chat.
@@ -50,6 +56,15 @@ Now, respond conversationally to the user’s message. Stay helpful, light, and
 
 """
 
+# Only this short tail is formatted per request; PROMPT_TEMPLATE is used verbatim
+CONTEXT_TEMPLATE = """METADATA
+- Today (ISO): {today}
+- User profile (JSON): {user_profile}
+- Recent conversation (JSON): {conversation_history}
+- Latest user message: {user_query}
+
+"""
+
 
 async def run_conversational_agent(
     user_profile: dict[str, Any],
@@ -58,22 +73,20 @@ async def run_conversational_agent(
     today: str,
 ) -> str:
     """Generate a conversational response via Dedalus."""
-    load_dotenv()
-    api_key = os.getenv("DEDALUS_API_KEY")
-    if not api_key:
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; conversational agent returning fallback.")
         return (
             f"Hey {user_profile.get('name', 'there')}! Thanks for checking in. "
             "Once the advisor service is fully set up I can chat in more detail. 😊"
         )
 
-    profile_str = json.dumps(user_profile or {}, indent=2)
-    history_str = json.dumps(conversation_history[-6:], indent=2) if conversation_history else "[]"
+    # Compact JSON: indentation only adds prompt tokens
+    profile_str = orjson.dumps(user_profile or {}).decode()
+    history_str = orjson.dumps(list(conversation_history[-6:])).decode() if conversation_history else "[]"
 
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
+    runner = get_runner()
 
-    prompt = PROMPT_TEMPLATE.format(
+    prompt = PROMPT_TEMPLATE + CONTEXT_TEMPLATE.format(
         today=today,
         user_profile=profile_str,
         conversation_history=history_str,
@@ -95,13 +108,11 @@ def run_conversational_agent_sync(
     today: str,
 ) -> str:
     """Synchronous helper for local testing."""
-    load_dotenv()
-    api_key = os.getenv("DEDALUS_API_KEY")
-    if not api_key:
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; conversational agent returning fallback.")
         return "Hi there! I’ll have more to share once the advisor service is enabled."
     try:
-        return asyncio.run(
+        return run_sync(
             run_conversational_agent(
                 user_profile=user_profile,
                 conversation_history=conversation_history,
@@ -2,14 +2,16 @@
 from __future__ import annotations
 
 import asyncio
-import os
 import re
-from typing import Sequence
+from functools import lru_cache
+from typing import Final, Mapping, Sequence
 
-from dotenv import load_dotenv
 from loguru import logger
 
-CREDIT_CARD_KNOWLEDGE = [
+from agent_runtime import api_key, run_sync
+
+# Immutable so the card index built from it at import can never go stale
+CREDIT_CARD_KNOWLEDGE: Final[tuple[str, ...]] = (
     # Travel / dining premium
     "Chase Sapphire Preferred — recommended score: 700+ — 2x–3x points on travel & dining, 1x elsewhere — annual fee ~$95 — good for travel redemptions and transfer partners.",
     "Chase Sapphire Reserve — recommended score: 740+ — 3x on travel & dining, Priority Pass, $300 annual travel credit — annual fee ~$550 — premium travel perks.",
@@ -51,53 +53,66 @@ CREDIT_CARD_KNOWLEDGE = [
     "Secured Credit Card (example) — recommended score: none (secured) — requires security deposit, helps build or rebuild credit — typically low rewards or none.",
     # Generic placeholder for other regionals / bank cards
     "Regional Bank Cashback Card (example) — recommended score: 680+ — 1.5%–3% on select categories, lower underwriting thresholds — good for local relationships.",
-]
-
-CATEGORY_KEYWORDS = {
-    "travel": {"travel", "flight", "air", "airline", "hotel", "vacation", "trip"},
-    "dining": {"dining", "restaurant", "food", "eat", "coffee", "drink"},
-    "groceries": {"grocery", "groceries", "supermarket", "market"},
-    "entertainment": {"concert", "entertainment", "movie", "show"},
-    "gas": {"gas", "fuel"},
-    "online": {"amazon", "online", "shopping"},
+)
+
+CATEGORY_KEYWORDS: Final[Mapping[str, frozenset[str]]] = {
+    "travel": frozenset({"travel", "flight", "air", "airline", "hotel", "vacation", "trip"}),
+    "dining": frozenset({"dining", "restaurant", "food", "eat", "coffee", "drink"}),
+    "groceries": frozenset({"grocery", "groceries", "supermarket", "market"}),
+    "entertainment": frozenset({"concert", "entertainment", "movie", "show"}),
+    "gas": frozenset({"gas", "fuel"}),
+    "online": frozenset({"amazon", "online", "shopping"}),
 }
 
-CATEGORY_RECOMMENDATIONS = {
-    "travel": [
+CATEGORY_RECOMMENDATIONS: Final[Mapping[str, tuple[tuple[str, str, str], ...]]] = {
+    "travel": (
         ("Chase Sapphire Preferred", "700+", "3x on travel/dining; strong transfer partners"),
         ("Capital One Venture Rewards", "700+", "2x everywhere with simple redemption"),
-    ],
-    "dining": [
+    ),
+    "dining": (
         ("American Express Gold", "720+", "4x on restaurants & US supermarkets"),
         ("Capital One Savor", "700+", "4x dining & entertainment"),
-    ],
-    "groceries": [
+    ),
+    "groceries": (
         ("Amex Blue Cash Preferred", "700+", "6% at US supermarkets"),
         ("Amex Blue Cash Everyday", "690+", "3% supermarkets with no annual fee"),
-    ],
-    "entertainment": [
+    ),
+    "entertainment": (
         ("Capital One Savor", "700+", "4x on entertainment and dining"),
         ("Chase Freedom Flex", "700+", "Rotating 5% categories often include entertainment"),
-    ],
-    "gas": [
+    ),
+    "gas": (
         ("Costco Anywhere Visa", "700+", "4% back on fuel (Costco membership required)"),
         ("Bank of America Customized Cash", "700+", "3% in chosen category like gas"),
-    ],
-    "online": [
+    ),
+    "online": (
         ("Amazon Prime Rewards Visa", "700+", "5% back at Amazon for Prime members"),
         ("Chase Freedom Unlimited", "700+", "1.5%-3% across categories including online spends"),
-    ],
+    ),
 }
 
 
-def _detect_category(user_query: str) -> str:
-    lowered = user_query.lower()
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        if any(word in lowered for word in keywords):
+# One compiled alternation per category, checked in CATEGORY_KEYWORDS order. Matching
+# stays substring-based ("restaurants" hits "restaurant"), like the original `in` checks.
+_CATEGORY_PATTERNS = tuple(
+    (category, re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))))
+    for category, keywords in CATEGORY_KEYWORDS.items()
+)
+
+
+@lru_cache(maxsize=512)
+def _detect_category_cached(lowered: str) -> str:
+    # Clear with _detect_category_cached.cache_clear() after changing CATEGORY_KEYWORDS
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(lowered):
             return category
     return "general"
 
 
+def _detect_category(user_query: str) -> str:
+    return _detect_category_cached(user_query.lower())
+
+
 def _format_recommendation(category: str) -> tuple[str, str]:
     recs = CATEGORY_RECOMMENDATIONS.get(category)
     if not recs:
@@ -117,6 +132,31 @@ def _format_backup(category: str) -> tuple[str, str] | None:
     return None
 
 
+def _build_card_index(catalog: Sequence[str]) -> dict[str, str]:
+    """Map every card name we can recommend to the first catalog entry mentioning it."""
+    names = dict.fromkeys(
+        [name for recs in CATEGORY_RECOMMENDATIONS.values() for name, *_ in recs]
+        + [_format_recommendation("general")[0]]
+    )
+    index: dict[str, str] = {}
+    for name in names:
+        entry = next((entry for entry in catalog if name in entry), None)
+        if entry is not None:
+            index[name] = entry
+    return index
+
+
+# Recommendation names are fixed, so resolve them against the built-in catalog once
+_CARD_INDEX = _build_card_index(CREDIT_CARD_KNOWLEDGE)
+
+
+def _find_card_entry(card_name: str, user_cards: Sequence[str]) -> str:
+    # The API always passes the built-in catalog, which the index already covers
+    if not user_cards or user_cards is CREDIT_CARD_KNOWLEDGE:
+        return _CARD_INDEX.get(card_name, card_name)
+    return next((entry for entry in user_cards if card_name in entry), card_name)
+
+
 def _clean_card_name(card: str) -> str:
     match = re.match(r"([A-Za-z0-9® ]+)", card)
     return match.group(1).strip() if match else card.split("—")[0].strip()
@@ -128,8 +168,7 @@ async def run_credit_score_agent(
     today: str,
 ) -> str:
     """Return a friendly credit card recommendation using heuristics."""
-    load_dotenv()
-    if not os.getenv("DEDALUS_API_KEY"):
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; credit agent returning fallback.")
         return (
             "**Best Card:** Chase Freedom Unlimited — recommended score 700+\n"
@@ -142,24 +181,16 @@ async def run_credit_score_agent(
 
     await asyncio.sleep(0)
 
-    catalog = user_cards or CREDIT_CARD_KNOWLEDGE
-
     category = _detect_category(user_query)
     best_card_name, best_score = _format_recommendation(category)
     backup = _format_backup(category)
 
-    best_card_details = next(
-        (entry for entry in catalog if best_card_name in entry),
-        best_card_name,
-    )
+    best_card_details = _find_card_entry(best_card_name, user_cards)
 
     backup_text = ""
     if backup:
         backup_name, backup_score = backup
-        backup_details = next(
-            (entry for entry in catalog if backup_name in entry),
-            backup_name,
-        )
+        backup_details = _find_card_entry(backup_name, user_cards)
         backup_text = f"**Backup Option:** {backup_details} (score {backup_score})"
 
     category_label = category.title() if category != "general" else "Everyday spending"
@@ -180,14 +211,13 @@ def run_credit_score_agent_sync(
     today: str,
 ) -> str:
     """Synchronous helper for CLI/testing."""
-    load_dotenv()
-    if not os.getenv("DEDALUS_API_KEY"):
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; credit agent returning fallback.")
         return (
             "Set up the advisor service (Dedalus API key) to unlock tailored credit card recommendations."
         )
 
-    return asyncio.run(
+    return run_sync(
         run_credit_score_agent(
             user_cards=user_cards,
             user_query=user_query,
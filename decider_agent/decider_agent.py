@@ -2,14 +2,17 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import os
+import hashlib
+import re
+import threading
 from typing import Any
 
-from dedalus_labs import AsyncDedalus, DedalusRunner
-from dotenv import load_dotenv
+import orjson
+from cachetools import TTLCache
 from loguru import logger
 
+from agent_runtime import api_key, get_runner, run_sync
+
 PROMPT_TEMPLATE = """
 You are Lattice — a ROUTER agent. Your ONLY job is to decide which downstream agent should handle the user’s message and output a SINGLE DIGIT with NO other text.
 
@@ -52,13 +55,100 @@ EXAMPLES (for your internal guidance)
 
 Now read the user’s latest message and output exactly one digit: 1, 2, 3, or 4.
 
-METADATA
+"""
+
+# Only this short tail is formatted per request; PROMPT_TEMPLATE is used verbatim,
+# so providers can cache the static instructions as a shared prompt prefix
+CONTEXT_TEMPLATE = """METADATA
 - Today (ISO): {today}
 - Chat context (JSON): {chat_context}
 - Latest user message: {user_query}
 
 """
 
+# LLM routing decisions keyed by normalized message + chat context, so a repeated
+# message in the same chat skips the model round trip
+_ROUTE_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=7 * 24 * 3600)
+_ROUTE_CACHE_LOCK = threading.Lock()
+_ROUTE_DIGITS = frozenset("1234")
+
+
+def _context_json(chat_context: dict[str, Any]) -> str:
+    # Compact and key-sorted, so the same context always renders byte-for-byte alike
+    return orjson.dumps(
+        chat_context, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
+def _route_cache_key(user_query: str, context_str: str) -> str:
+    normalized = " ".join(user_query.lower().split())
+    return hashlib.sha1(f"{normalized}\0{context_str}".encode()).hexdigest()
+
+# Keyword cues per route in priority order (group beats credit beats individual).
+# Each class is one precompiled alternation; matching is substring-based, so the
+# padded cues like "we " and " group" keep their word-boundary intent.
+_HEURISTIC_ROUTES = tuple(
+    (digit, re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))))
+    for digit, keywords in (
+        ("3", ("split", "settle", "owe", "per person", "we ", " our ", " group", "team", "together", "let's", "lets")),
+        ("2", ("credit score", "best card", "cashback", "points", "apr", "reward", "signup bonus")),
+        (
+            "1",
+            (
+                "should i buy",
+                "buy now",
+                "buying",
+                "afford",
+                "my spending",
+                "my budget",
+                "my transactions",
+                "can i buy",
+            ),
+        ),
+    )
+)
+
+
+# Bare greetings and acknowledgements always go to the conversational agent
+_TRIVIAL_GREETINGS = frozenset(
+    {"hi", "hello", "hey", "yo", "sup", "thanks", "thank you", "ok", "okay", "cool"}
+)
+
+
+def _heuristic_route(message: str) -> str | None:
+    lowered = message.lower()
+    if not lowered:
+        return None
+
+    # Checked before the keyword scan; trailing punctuation ("hi!") is ignored
+    trimmed = lowered.rstrip("!.?,~ ")
+    if len(trimmed) <= 2 or trimmed in _TRIVIAL_GREETINGS:
+        return "4"
+
+    for digit, pattern in _HEURISTIC_ROUTES:
+        if pattern.search(lowered):
+            return digit
+    return None
+
+
+# Model calls in flight, keyed by (event loop, routing cache key)
+_ROUTE_INFLIGHT: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Future[str]] = {}
+
+
+async def _route_with_model(prompt: str, cache_key: str) -> str:
+    runner = get_runner()
+    result = await runner.run(
+        input=prompt,
+        model="openai/gpt-4.1-mini",
+    )
+
+    digit = result.final_output.strip() if isinstance(result.final_output, str) else None
+    if digit in _ROUTE_DIGITS:
+        with _ROUTE_CACHE_LOCK:
+            _ROUTE_CACHE[cache_key] = digit
+
+    return result.final_output
+
 
 async def run_decider_agent(
     user_query: str,
@@ -66,61 +156,39 @@ async def run_decider_agent(
     today: str,
 ) -> str:
     """Return the decider digit output."""
-    load_dotenv()
     user_query = (user_query or "").strip()
     chat_context = chat_context or {}
 
-    def _heuristic_route(message: str) -> str | None:
-        lowered = message.lower()
-        if not lowered:
-            return None
-
-        group_keywords = {"split", "settle", "owe", "per person", "we ", " our ", " group", "team", "together", "let's", "lets"}
-        credit_keywords = {"credit score", "best card", "cashback", "points", "apr", "reward", "signup bonus"}
-        individual_keywords = {
-            "should i buy",
-            "buy now",
-            "buying",
-            "afford",
-            "my spending",
-            "my budget",
-            "my transactions",
-            "can i buy",
-        }
-
-        if any(term in lowered for term in group_keywords):
-            return "3"
-        if any(term in lowered for term in credit_keywords):
-            return "2"
-        if any(term in lowered for term in individual_keywords):
-            return "1"
-        return None
-
     heuristic_result = _heuristic_route(user_query)
     if heuristic_result:
         return heuristic_result
 
-    if not os.getenv("DEDALUS_API_KEY"):
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; decider returning conversational fallback.")
         return "4"
 
-    context_str = json.dumps(chat_context, indent=2)
-
-    client = AsyncDedalus()
-    runner = DedalusRunner(client)
-
-    prompt = PROMPT_TEMPLATE.format(
-        today=today,
-        user_query=user_query,
-        chat_context=context_str,
-    )
-
-    result = await runner.run(
-        input=prompt,
-        model="openai/gpt-4.1-mini",
-    )
+    context_str = _context_json(chat_context)
+    cache_key = _route_cache_key(user_query, context_str)
+    with _ROUTE_CACHE_LOCK:
+        cached = _ROUTE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Identical messages routed at the same time share one model call
+    inflight_key = (asyncio.get_running_loop(), cache_key)
+    task = _ROUTE_INFLIGHT.get(inflight_key)
+    if task is None:
+        prompt = PROMPT_TEMPLATE + CONTEXT_TEMPLATE.format(
+            today=today,
+            user_query=user_query,
+            chat_context=context_str,
+        )
+        task = asyncio.ensure_future(_route_with_model(prompt, cache_key))
+        _ROUTE_INFLIGHT[inflight_key] = task
+        task.add_done_callback(lambda _: _ROUTE_INFLIGHT.pop(inflight_key, None))
 
-    return result.final_output
+    # Shielded so one caller being cancelled doesn't cancel the call for the rest
+    return await asyncio.shield(task)
 
 
 def run_decider_agent_sync(
@@ -129,9 +197,8 @@ def run_decider_agent_sync(
     today: str,
 ) -> str:
     """Synchronous helper."""
-    load_dotenv()
     try:
-        return asyncio.run(
+        return run_sync(
             run_decider_agent(
                 user_query=user_query,
                 chat_context=chat_context,
@@ -1,16 +1,16 @@
 """Group task coordination agent."""
 from __future__ import annotations
 
-import asyncio
-import json
-import os
+import heapq
 import re
-from typing import Any, Iterable, Optional
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional
 
-from dedalus_labs import AsyncDedalus, DedalusRunner
-from dotenv import load_dotenv
+import orjson
 from loguru import logger
 
+from agent_runtime import api_key, get_runner, run_sync
+
 PROMPT_TEMPLATE = """\
 You are Lattice — a friendly group finance & task co-pilot for a chat of friends or teammates.
 Keep the conversation natural while quietly doing the math and logistics: split costs, suggest fair shares, decide if the group should buy something now or later, and manage lightweight follow-ups (reminders, who’s bringing what, settle-ups).
@@ -19,17 +19,10 @@ TOOLS YOU CAN USE
 - Brave Search MCP to check quick price/availability/trend signals for any items in question.
 
 INFORMATION YOU HAVE
-- Today (ISO): {today}
-- Group name: {group_name}
-- Members (with optional budgets/notes): {group_members}
-- Currency: {currency}
-- Group default rules (if any): {group_rules}
-- Group expense history (paid, participants, notes): {group_history}
-- Raw context dump (debug): {context_dump}
-- User message: {user_message}
+- The GROUP CONTEXT block at the end of this prompt: today’s date, group name, members, currency, rules, expense history, a raw context dump, split hints, precomputed settle-up transfers when balances are known, and the user message.
 
 PRIMARY INTENTS YOU HANDLE (infer from the chat)
-1) Split this cost — “Split {{amount}} among {{participants}} people” (or a subset of members).
+1) Split this cost — “Split {amount} among {participants} people” (or a subset of members).
 2) Is this a good group purchase? (e.g., “Should we buy a projector for the Airbnb?”)
 3) Light group tasking: reminders, checklists, who’s bringing what, RSVPs, deadlines.
 4) Settle up: compute net balances and propose the fewest transactions to get even.
@@ -56,7 +49,7 @@ GROUP PURCHASE EVALUATION (buy now vs wait)
 
 SETTLE-UP FLOW
 - Compute each member’s net balance from the history: paid minus owed.
-- Propose a minimal set of transfers (debt simplification).
+- Propose a minimal set of transfers (debt simplification). When the GROUP CONTEXT lists precomputed settle-up transfers, use those as given.
 - Offer to start a secure settle-up flow (Knot) only after explicit consent.
 - Provide simple instructions or links the group can act on.
 
@@ -67,36 +60,68 @@ LIGHT TASKS YOU CAN MANAGE
 - Track decisions and next steps at the end of your message.
 
 EDGE CASES & POLICIES
-- If info is missing, state your assumption and proceed (“Assuming all {participant_hint} are in; shout if not.”).
+- If info is missing, state your assumption and proceed (“Assuming all N members are in; shout if not.”, using the participant count from the split hints).
 - If conflicts arise (someone opted out), recalc immediately and show the new amounts.
 - Don’t expose sensitive details; keep card numbers and private data out of chat.
 - Be consent-first. Never trigger payments or share personal info without explicit okay.
 
 OUTPUT STYLE (examples, not strict)
-- Splits: “Total {amount_hint} ÷ {participant_hint} = ${per_person}. With tip, it’s about ${per_person_tip}. I assumed everyone listed; say ‘remove Alex’ to recalc.”
+- Splits: “Total $120.00 ÷ 4 members = $30.00. With tip, it’s about $34.50. I assumed everyone listed; say ‘remove Alex’ to recalc.” (use the split hints below)
 - Purchases: “I’d wait a bit. Prices for ___ dip mid-week, and we’re over our informal cap. Want me to remind you if it drops under $___?”
 - Settle-ups: “To get even: Sam → Priya $24, Ken → Dani $18.”
 
 Do not promise future memory; just summarise decisions and next steps clearly.
-Now respond conversationally to the current group message with these guidelines."""
+Now respond conversationally to the current group message with these guidelines.
+
+"""
+
+# Only this short tail is formatted per request; PROMPT_TEMPLATE is used verbatim,
+# so providers can cache the static instructions as a shared prompt prefix
+CONTEXT_TEMPLATE = """GROUP CONTEXT
+- Today (ISO): {today}
+- Group name: {group_name}
+- Members (with optional budgets/notes): {group_members}
+- Currency: {currency}
+- Group default rules (if any): {group_rules}
+- Group expense history (paid, participants, notes): {group_history}
+- Raw context dump (debug): {context_dump}
+- Split hints: total {amount_hint}; participants {participant_hint}; per person {per_person}; per person with 15% tip {per_person_tip}
+{settle_up_line}- User message: {user_message}
+"""
 
 
 def _serialise(value: Any) -> str:
     if value in (None, "", [], {}):
         return "Not provided."
+    # Compact, key-sorted JSON: indentation only adds prompt tokens
     try:
-        return json.dumps(value, indent=2, ensure_ascii=False)
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
     except TypeError:
         return str(value)
 
 
-def _format_members(members: Iterable[dict[str, Any]]) -> str:
+# (name, role, budget, notes) with everything already stringified; budget stays
+# None when absent because a budget of 0 is still shown
+_MemberKey = tuple[str, str, Optional[str], str]
+
+
+def _member_key(member: dict[str, Any]) -> _MemberKey:
+    name = member.get("name") or member.get("display_name") or "Member"
+    role = member.get("role")
+    budget = member.get("budget")
+    notes = member.get("notes")
+    return (
+        str(name),
+        str(role) if role else "",
+        str(budget) if budget is not None else None,
+        str(notes) if notes else "",
+    )
+
+
+@lru_cache(maxsize=256)
+def _format_members_cached(members_key: tuple[_MemberKey, ...]) -> str:
     formatted = []
-    for member in members or []:
-        name = member.get("name") or member.get("display_name") or "Member"
-        role = member.get("role")
-        budget = member.get("budget")
-        notes = member.get("notes")
+    for name, role, budget, notes in members_key:
         details = []
         if role:
             details.append(f"role: {role}")
@@ -113,10 +138,23 @@ def _format_members(members: Iterable[dict[str, Any]]) -> str:
     return ", ".join(formatted)
 
 
+def _format_members(members: Iterable[dict[str, Any]]) -> str:
+    # Rosters rarely change between messages, so memoise on their formatted fields
+    return _format_members_cached(tuple(_member_key(member) for member in members or []))
+
+
+# Tip assumed in the per-person hint
+_TIP_RATE = 0.15
+
+_AMOUNT_RE = re.compile(r"(?:\$|usd|\b)(\d+(?:\.\d{1,2})?)", re.IGNORECASE)
+
+
 def _extract_amount(text: str) -> float | None:
     if not text:
         return None
-    match = re.search(r"(?:\$|usd|\b)(\d+(?:\.\d{1,2})?)", text.replace(",", ""), re.IGNORECASE)
+    if "," in text:
+        text = text.replace(",", "")
+    match = _AMOUNT_RE.search(text)
     if not match:
         return None
     try:
@@ -125,6 +163,54 @@ def _extract_amount(text: str) -> float | None:
         return None
 
 
+def _settle_up(balances: Mapping[str, Any]) -> list[tuple[str, str, float]]:
+    """
+    Propose transfers that settle net balances (positive = owed money).
+
+    Greedy: the largest debtor pays the largest creditor until one of them is
+    even, using heaps over integer cents so rounding never leaves a stray cent.
+    """
+    creditors: list[tuple[int, str]] = []
+    debtors: list[tuple[int, str]] = []
+    for name, balance in balances.items():
+        try:
+            cents = round(float(balance) * 100)
+        except (TypeError, ValueError):
+            continue
+        if cents > 0:
+            creditors.append((-cents, str(name)))
+        elif cents < 0:
+            debtors.append((cents, str(name)))
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        cents = min(-credit, -debt)
+        transfers.append((debtor, creditor, cents / 100))
+        if -credit > cents:
+            heapq.heappush(creditors, (credit + cents, creditor))
+        if -debt > cents:
+            heapq.heappush(debtors, (debt + cents, debtor))
+    return transfers
+
+
+def _format_settle_up_line(balances: Any) -> str:
+    """Context line with precomputed transfers, or "" when no balances were provided."""
+    if not isinstance(balances, Mapping) or not balances:
+        return ""
+    transfers = _settle_up(balances)
+    if not transfers:
+        summary = "Everyone is already even."
+    else:
+        summary = ", ".join(
+            f"{debtor} → {creditor} ${amount:.2f}" for debtor, creditor, amount in transfers
+        )
+    return f"- Settle-up transfers (precomputed from balances): {summary}\n"
+
+
 def _coerce_int(value: Any) -> Optional[int]:
     if isinstance(value, int):
         return value
@@ -149,26 +235,22 @@ async def run_group_task_agent(
     if participants_count == 0:
         participants_count = _coerce_int(group_context.get("participant_count")) or 0
     amount_value = _extract_amount(user_query)
+    # Equal share, computed once for both the fallback reply and the prompt hints
+    per_person_share = (
+        amount_value / participants_count
+        if amount_value is not None and participants_count > 0
+        else None
+    )
 
-    load_dotenv()
-    api_key = os.getenv("DEDALUS_API_KEY")
-    base_url = os.getenv("DEDALUS_BASE_URL")
-    if not api_key:
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; group task agent returning fallback.")
-        if amount_value is not None and participants_count:
-            try:
-                per_person = amount_value / float(participants_count)
-            except ZeroDivisionError:
-                per_person = None
-        else:
-            per_person = None
 
         members_list = members if members else [{"name": "Member 1"}, {"name": "Member 2"}]
         split_lines = []
         for member in members_list:
             name = member.get("name") or "Member"
-            if per_person is not None:
-                split_lines.append(f"- {name}: ${per_person:0.2f}")
+            if per_person_share is not None:
+                split_lines.append(f"- {name}: ${per_person_share:0.2f}")
             else:
                 split_lines.append(f"- {name}: amount TBD")
         split_hint = "\n".join(split_lines)
@@ -196,34 +278,23 @@ async def run_group_task_agent(
     group_rules_str = _serialise(group_rules)
     group_history_str = _serialise(group_history)
     members_str = _format_members(members)
+    settle_up_line = _format_settle_up_line(group_context.get("balances"))
     participant_hint = (
         f"{participants_count} members"
         if participants_count
         else "everyone involved"
     )
     amount_hint = f"${amount_value:0.2f}" if amount_value is not None else "the amount mentioned"
-    per_person = (
-        f"{amount_value / participants_count:.2f}"
-        if amount_value is not None and isinstance(participants_count, int) and participants_count > 0
-        else "calculated after confirming participants"
-    )
-    per_person_tip = (
-        f"{(amount_value * 1.15) / participants_count:.2f}"
-        if (
-            amount_value is not None
-            and isinstance(participants_count, int)
-            and participants_count > 0
-        )
-        else "depends on final tip"
-    )
+    if per_person_share is not None:
+        per_person = f"${per_person_share:.2f}"
+        per_person_tip = f"${per_person_share * (1 + _TIP_RATE):.2f}"
+    else:
+        per_person = "calculated after confirming participants"
+        per_person_tip = "depends on final tip"
 
-    client_options: dict[str, Any] = {"api_key": api_key}
-    if base_url:
-        client_options["base_url"] = base_url
-    client = AsyncDedalus(**client_options)
-    runner = DedalusRunner(client)
+    runner = get_runner()
 
-    prompt = PROMPT_TEMPLATE.format(
+    prompt = PROMPT_TEMPLATE + CONTEXT_TEMPLATE.format(
         today=today,
         group_name=group_name,
         group_members=members_str,
@@ -236,6 +307,7 @@ async def run_group_task_agent(
         amount_hint=amount_hint,
         per_person=per_person,
         per_person_tip=per_person_tip,
+        settle_up_line=settle_up_line,
     )
 
     result = await runner.run(
@@ -252,13 +324,11 @@ def run_group_task_agent_sync(
     today: str,
 ) -> str:
     """Synchronous helper."""
-    load_dotenv()
-    api_key = os.getenv("DEDALUS_API_KEY")
-    if not api_key:
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; group task agent returning fallback.")
         return "I’ll help with the split once the advisor service is configured."
     try:
-        return asyncio.run(
+        return run_sync(
             run_group_task_agent(
                 group_context=group_context,
                 user_query=user_query,
@@ -2,11 +2,17 @@
 
 from .individual_agent import (
     run_individual_agent,
+    run_individual_agent_batch,
+    run_individual_agent_many,
     run_individual_agent_sync,
+    stream_individual_agent,
 )
 
 __all__ = [
     "run_individual_agent",
+    "run_individual_agent_batch",
+    "run_individual_agent_many",
     "run_individual_agent_sync",
+    "stream_individual_agent",
 ]
 
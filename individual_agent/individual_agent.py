@@ -2,25 +2,72 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import hashlib
+import inspect
 import os
+import threading
+from array import array
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Any, Iterable, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable, NamedTuple, Optional, Sequence
 
-from dedalus_labs import AsyncDedalus, DedalusRunner
+from cachetools import LRUCache, TTLCache
 try:
     from dedalus_labs import APITimeoutError  # type: ignore
 except ImportError:  # pragma: no cover - library version without explicit export
     class APITimeoutError(Exception):
         """Fallback timeout error type when dedalus_labs does not expose it."""
         pass
-from dotenv import load_dotenv
 from loguru import logger
 
+from agent_runtime import api_key, get_runner, refresh_settings, run_sync
+
+if TYPE_CHECKING:
+    from dedalus_labs import DedalusRunner
+
 
 FALLBACK_WINDOW_DAYS = 30
 FALLBACK_RECENT_DAYS = 7
 DEFAULT_TIMEOUT_SECONDS = 60
+DEFAULT_BATCH_CONCURRENCY = 8
+# Room for a reasoning model's hidden tokens plus the long formatted answer
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+# Our own lighter second attempt and deterministic fallback follow a failure, so
+# one SDK-level retry is enough and keeps the worst case bounded
+SDK_MAX_RETRIES = 1
+
+
+def _parse_int(value: Optional[str], default: int) -> int:
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+# Agent-specific tuning, read once at import (agent_runtime has already loaded .env)
+_TIMEOUT_SECONDS = _parse_int(os.getenv("DEDALUS_AGENT_TIMEOUT"), DEFAULT_TIMEOUT_SECONDS)
+_BATCH_CONCURRENCY = max(_parse_int(os.getenv("DEDALUS_CONCURRENCY"), DEFAULT_BATCH_CONCURRENCY), 1)
+_MAX_OUTPUT_TOKENS = _parse_int(os.getenv("DEDALUS_MAX_TOKENS"), DEFAULT_MAX_OUTPUT_TOKENS)
+# Seconds the primary attempt runs alone before the lighter one is started; defaults
+# to half the timeout, since gpt-5 with web search routinely needs several seconds
+_HEDGE_DELAY_SECONDS = _parse_int(os.getenv("DEDALUS_HEDGE_DELAY"), _TIMEOUT_SECONDS // 2)
+
+
+def _refresh_settings() -> None:
+    """Re-read the Dedalus settings, e.g. after a test changes the environment."""
+    global _TIMEOUT_SECONDS, _BATCH_CONCURRENCY, _MAX_OUTPUT_TOKENS, _HEDGE_DELAY_SECONDS
+    _TIMEOUT_SECONDS = _parse_int(os.getenv("DEDALUS_AGENT_TIMEOUT"), DEFAULT_TIMEOUT_SECONDS)
+    _BATCH_CONCURRENCY = max(_parse_int(os.getenv("DEDALUS_CONCURRENCY"), DEFAULT_BATCH_CONCURRENCY), 1)
+    _MAX_OUTPUT_TOKENS = _parse_int(os.getenv("DEDALUS_MAX_TOKENS"), DEFAULT_MAX_OUTPUT_TOKENS)
+    _HEDGE_DELAY_SECONDS = _parse_int(os.getenv("DEDALUS_HEDGE_DELAY"), _TIMEOUT_SECONDS // 2)
+    # Drops the cached runners too, so the next call picks up the new client options
+    refresh_settings()
+
+
+def _get_runner() -> DedalusRunner:
+    # The HTTP-level timeout aborts a hung read even outside asyncio.wait_for
+    return get_runner("individual", timeout=float(_TIMEOUT_SECONDS), max_retries=SDK_MAX_RETRIES)
 
 
 def _safe_float(value: Any) -> float:
@@ -40,43 +87,145 @@ def _iter_transactions(mock_purchases: dict[str, Any]) -> Iterable[dict[str, Any
 def _parse_datetime(value: str) -> Optional[datetime]:
     if not value:
         return None
+    # fromisoformat accepts a trailing "Z" on full timestamps since Python 3.11, so
+    # the rewritten copy is only needed for rarer forms such as a bare "2025-11-01Z"
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    if "Z" not in value:
+        return None
     try:
         return datetime.fromisoformat(value.replace("Z", "+00:00"))
     except ValueError:
         return None
 
 
-def _build_deterministic_recommendation(
-    mock_purchases: dict[str, Any],
-    user_query: str,
-    today: str,
-) -> str:
-    today_dt = _parse_datetime(today) or datetime.now(timezone.utc)
-    if today_dt.tzinfo is None:
-        today_dt = today_dt.replace(tzinfo=timezone.utc)
-    start_30 = today_dt - timedelta(days=FALLBACK_WINDOW_DAYS)
-    start_7 = today_dt - timedelta(days=FALLBACK_RECENT_DAYS)
+class _TransactionTable(NamedTuple):
+    """Transactions as parallel columns (struct-of-arrays) for the fallback aggregation."""
+
+    amounts: array  # float64
+    timestamps: array  # epoch seconds, float64
+    merchant_ids: array  # index into merchant_names
+    merchant_names: tuple[str, ...]
 
-    total_30 = 0.0
-    total_7 = 0.0
-    merchant_totals: dict[str, float] = {}
+
+def _build_transaction_table(mock_purchases: dict[str, Any]) -> _TransactionTable:
+    """
+    Flatten transactions into a _TransactionTable.
+
+    Rows without a parseable datetime are dropped; the amount falls back to the
+    summed payment methods when the price total is missing or zero.
+    """
+    amounts = array("d")
+    timestamps = array("d")
+    merchant_ids = array("l")
+    merchant_names: list[str] = []
+    merchant_index: dict[str, int] = {}
 
     for tx in _iter_transactions(mock_purchases):
         tx_dt = _parse_datetime(tx.get("datetime"))
         if not tx_dt:
             continue
+        if tx_dt.tzinfo is None:
+            tx_dt = tx_dt.replace(tzinfo=timezone.utc)
         price = tx.get("price") or {}
         amount = _safe_float(price.get("total")) or sum(
             _safe_float(pm.get("transaction_amount")) for pm in tx.get("payment_methods") or []
         )
         merchant_name = (tx.get("merchant") or {}).get("name") or "Unknown merchant"
+        merchant_id = merchant_index.get(merchant_name)
+        if merchant_id is None:
+            merchant_id = merchant_index[merchant_name] = len(merchant_names)
+            merchant_names.append(merchant_name)
+
+        amounts.append(amount)
+        timestamps.append(tx_dt.timestamp())
+        merchant_ids.append(merchant_id)
+
+    return _TransactionTable(amounts, timestamps, merchant_ids, tuple(merchant_names))
+
+
+# Tables keyed by id() of the purchases dict. The transactions loader hands back the
+# same dict until a file changes, so repeat fallbacks skip the rebuild; each entry
+# holds the dict itself, so its id can't be reused while cached.
+_TABLE_CACHE: LRUCache = LRUCache(maxsize=32)
+_TABLE_CACHE_LOCK = threading.Lock()
 
-        if tx_dt >= start_30:
-            total_30 += amount
-            merchant_totals[merchant_name] = merchant_totals.get(merchant_name, 0.0) + amount
-        if tx_dt >= start_7:
+
+def _get_transaction_table(mock_purchases: dict[str, Any]) -> _TransactionTable:
+    key = id(mock_purchases)
+    with _TABLE_CACHE_LOCK:
+        cached = _TABLE_CACHE.get(key)
+    if cached is not None and cached[0] is mock_purchases:
+        return cached[1]
+
+    table = _build_transaction_table(mock_purchases)
+    with _TABLE_CACHE_LOCK:
+        _TABLE_CACHE[key] = (mock_purchases, table)
+    return table
+
+
+def _aggregate(
+    table: _TransactionTable,
+    start_30: float,
+    start_7: float,
+) -> tuple[float, float, dict[str, float]]:
+    """
+    Return (30-day total, 7-day total, 30-day total per merchant) in one pass.
+    Expects start_7 >= start_30.
+
+    Accumulators are locals, and merchant totals are keyed in order of first
+    appearance within the window, so ties resolve to the earliest merchant.
+    """
+    total_30 = 0.0
+    total_7 = 0.0
+    per_merchant: defaultdict[int, float] = defaultdict(float)
+    for amount, ts, merchant_id in zip(table.amounts, table.timestamps, table.merchant_ids):
+        # The 7-day window sits inside the 30-day one, so older rows take a single
+        # comparison and skip the rest of the body
+        if ts < start_30:
+            continue
+        total_30 += amount
+        per_merchant[merchant_id] += amount
+        if ts >= start_7:
             total_7 += amount
 
+    names = table.merchant_names
+    return total_30, total_7, {names[merchant_id]: total for merchant_id, total in per_merchant.items()}
+
+
+def _window_starts_from(today_dt: datetime) -> tuple[float, float]:
+    if today_dt.tzinfo is None:
+        today_dt = today_dt.replace(tzinfo=timezone.utc)
+    return (
+        (today_dt - timedelta(days=FALLBACK_WINDOW_DAYS)).timestamp(),
+        (today_dt - timedelta(days=FALLBACK_RECENT_DAYS)).timestamp(),
+    )
+
+
+@lru_cache(maxsize=64)
+def _parsed_window_starts(today: str) -> Optional[tuple[float, float]]:
+    today_dt = _parse_datetime(today)
+    return _window_starts_from(today_dt) if today_dt else None
+
+
+def _window_starts(today: str) -> tuple[float, float]:
+    """Epoch starts of the 30- and 7-day windows, memoised per ``today`` string."""
+    # Only parsed dates are cached; a missing or bad one means "now", which moves
+    return _parsed_window_starts(today) or _window_starts_from(datetime.now(timezone.utc))
+
+
+def _build_deterministic_recommendation(
+    mock_purchases: dict[str, Any],
+    user_query: str,
+    today: str,
+) -> str:
+    start_30, start_7 = _window_starts(today)
+    total_30, total_7, merchant_totals = _aggregate(
+        _get_transaction_table(mock_purchases), start_30, start_7
+    )
+
     if merchant_totals:
         top_merchant, top_total = max(merchant_totals.items(), key=lambda item: item[1])
         top_line = f"Top merchant: {top_merchant} (${top_total:,.2f})."
@@ -99,33 +248,9 @@ def _build_deterministic_recommendation(
     )
 
 
-async def run_individual_agent(
-    mock_purchases: dict[str, Any],
-    user_query: str,
-    today: str,
-) -> str:
-    """Run the individual agent asynchronously and return the final output text."""
-    load_dotenv()
-    api_key = os.getenv("DEDALUS_API_KEY")
-    if not api_key:
-        logger.warning("DEDALUS_API_KEY not set; returning fallback recommendation.")
-        return _build_deterministic_recommendation(mock_purchases, user_query, today)
-
-    client_options: dict[str, Any] = {"api_key": api_key}
-    base_url = os.getenv("DEDALUS_BASE_URL")
-    if base_url:
-        client_options["base_url"] = base_url
-
-    timeout_env = os.getenv("DEDALUS_AGENT_TIMEOUT")
-    try:
-        timeout_seconds = int(timeout_env) if timeout_env else DEFAULT_TIMEOUT_SECONDS
-    except ValueError:
-        timeout_seconds = DEFAULT_TIMEOUT_SECONDS
-
-    client = AsyncDedalus(**client_options)
-    runner = DedalusRunner(client)
-
-    prompt = f"""
+# Static instructions, identical on every call so providers can cache them as a
+# shared prompt prefix
+PROMPT_TEMPLATE = """
 You are Lattice — an individual spending advisor agent for one user.
 Your job: given the user's purchase question, analyze (1) their recent spending behavior
 (from provided transaction history), (2) external price trends via Brave Search MCP, and
@@ -142,13 +267,6 @@ When searching, try queries like (fill in ____ with relevant terms regarding to
 - "price drop patterns for ___ near event date"
 - "seasonality or demand peaks for ___"
 
-INFORMATION YOU HAVE
---------------------
-- Today (ISO): {today}
-- User Purchase Query: {user_query}
-- Past Purchase History:
-{mock_purchases}
-
 WHAT TO DO
 ----------
 A) PERSONAL SPENDING ANALYSIS
@@ -228,13 +346,108 @@ Show your step-by-step reasoning for financial analysis, price trend estimation,
 
 Use a lot of related emojis while explaining your step-by-step reasoning for financial analysis.
 
+"""
+
+# Only this short tail is formatted per request; PROMPT_TEMPLATE is used verbatim
+CONTEXT_TEMPLATE = """INFORMATION YOU HAVE
+--------------------
+- Today (ISO): {today}
+- User Purchase Query: {user_query}
+- Past Purchase History (one transaction per line: date | merchant | amount | items):
+{purchase_history}
+
 Now proceed.
     """
 
+
+def _compact_purchase_history(mock_purchases: dict[str, Any]) -> str:
+    """
+    Condense the stored Knot payloads to one line per transaction for the prompt.
+
+    Only date, merchant, amount and item names are kept; the raw payloads repeat
+    every order (and the raw API response) in full and cost far more tokens.
+    """
+    lines = []
+    for payload in (mock_purchases or {}).values():
+        payload_merchant = (payload.get("merchant") or {}).get("name")
+        for tx in payload.get("transactions") or []:
+            price = tx.get("price") or {}
+            amount = (
+                _safe_float(price.get("total"))
+                or _safe_float(price.get("amount"))
+                or _safe_float(tx.get("price_amount"))
+                or sum(_safe_float(pm.get("transaction_amount")) for pm in tx.get("payment_methods") or [])
+            )
+            merchant = (
+                (tx.get("merchant") or {}).get("name")
+                or tx.get("merchant_name")
+                or payload_merchant
+                or "Unknown merchant"
+            )
+            items = [p.get("name") for p in tx.get("products") or [] if isinstance(p, dict) and p.get("name")]
+            date = str(tx.get("datetime") or "")[:10] or "unknown date"
+            lines.append(f"{date} | {merchant} | {amount:.2f} | {'; '.join(items) or '-'}")
+    return "\n".join(lines) or "No transactions on record."
+
+
+def _build_prompt(purchase_history: str, user_query: str, today: str) -> str:
+    return PROMPT_TEMPLATE + CONTEXT_TEMPLATE.format_map(
+        {"today": today, "user_query": user_query, "purchase_history": purchase_history}
+    )
+
+
+# Recent model answers keyed by a digest of (compact history, query, today), so
+# reloads and retries of the same question skip the model round trip
+_RESULT_CACHE: TTLCache = TTLCache(maxsize=256, ttl=15 * 60)
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def _result_cache_key(purchase_history: str, user_query: str, today: str) -> str:
+    normalized = " ".join(user_query.lower().split())
+    return hashlib.blake2b(f"{purchase_history}\0{normalized}\0{today}".encode(), digest_size=16).hexdigest()
+
+
+def _log_attempt_failure(label: str, exc: BaseException) -> None:
+    if isinstance(exc, (asyncio.TimeoutError, APITimeoutError)):
+        logger.warning("Individual agent {} attempt timed out ({}).", label, exc)
+    else:
+        logger.warning("Individual agent {} attempt failed ({}).", label, exc)
+
+
+async def run_individual_agent(
+    mock_purchases: dict[str, Any],
+    user_query: str,
+    today: str,
+    ignore_cache: bool = False,
+) -> str:
+    """
+    Run the individual agent asynchronously and return the final output text.
+
+    Full (web-search) answers for the same purchase history, query and day are
+    reused for a short while; pass ``ignore_cache=True`` to force a fresh model call.
+    """
+    if not api_key():
+        logger.warning("DEDALUS_API_KEY not set; returning fallback recommendation.")
+        return _build_deterministic_recommendation(mock_purchases, user_query, today)
+
+    purchase_history = _compact_purchase_history(mock_purchases)
+    cache_key = _result_cache_key(purchase_history, user_query, today)
+    if not ignore_cache:
+        with _RESULT_CACHE_LOCK:
+            cached = _RESULT_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    timeout_seconds = _TIMEOUT_SECONDS
+    runner = _get_runner()
+
+    prompt = _build_prompt(purchase_history, user_query, today)
+
     async def _execute_agent(model: str, use_mcp: bool, timeout_value: int) -> str:
         kwargs: dict[str, Any] = {
             "input": prompt,
             "model": model,
+            "max_tokens": _MAX_OUTPUT_TOKENS,
         }
         if use_mcp:
             kwargs["mcp_servers"] = ["windsor/brave-search-mcp"]
@@ -242,40 +455,140 @@ Now proceed.
             runner.run(**kwargs),
             timeout=timeout_value,
         )
+        # Only the full (MCP) answer is cached: the lighter hedge answer has no web
+        # search and the deterministic fallback is cheap to rebuild
+        if use_mcp:
+            with _RESULT_CACHE_LOCK:
+                _RESULT_CACHE[cache_key] = result.final_output
         return result.final_output
 
-    # Attempt 1: full experience (Brave MCP, gpt-5)
+    # Attempt 1: full experience (Brave MCP, gpt-5). If it hasn't answered within the
+    # hedge delay (or fails sooner), attempt 2 -- a lighter model without MCP tools --
+    # starts alongside it and the first good answer wins.
+    secondary_timeout = max(timeout_seconds // 2, 15)
+    primary = asyncio.ensure_future(_execute_agent("openai/gpt-5", True, timeout_seconds))
+    pending: set[asyncio.Future[str]] = {primary}
     try:
-        return await _execute_agent("openai/gpt-5", True, timeout_seconds)
-    except (asyncio.TimeoutError, APITimeoutError) as timeout_exc:
-        logger.warning(
-            "Individual agent primary attempt timed out after %s seconds (%s). Retrying with lighter settings.",
-            timeout_seconds,
-            timeout_exc,
-        )
-    except Exception as primary_exc:
-        logger.warning(
-            "Individual agent primary attempt failed (%s). Retrying with lighter settings.",
-            primary_exc,
+        done, pending = await asyncio.wait(pending, timeout=_HEDGE_DELAY_SECONDS)
+        if primary in done:
+            if primary.exception() is None:
+                return primary.result()
+            _log_attempt_failure("primary", primary.exception())
+
+        pending.add(
+            asyncio.ensure_future(_execute_agent("openai/gpt-4.1-mini", False, secondary_timeout))
         )
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                _log_attempt_failure("primary" if task is primary else "secondary", task.exception())
+    finally:
+        for task in pending:
+            task.cancel()
+
+    logger.error("Individual agent attempts failed; returning fallback recommendation.")
+    return _build_deterministic_recommendation(mock_purchases, user_query, today)
 
-    # Attempt 2: lighter model, no MCP tools (faster & more reliable)
-    secondary_timeout = max(timeout_seconds // 2, 15)
+
+def _chunk_text(chunk: Any) -> str:
+    """Pull the text delta out of a streamed chunk (plain text or chat-completion style)."""
+    if isinstance(chunk, str):
+        return chunk
+    choices = getattr(chunk, "choices", None)
+    if choices:
+        delta = getattr(choices[0], "delta", None)
+        return getattr(delta, "content", None) or ""
+    return getattr(chunk, "delta", None) or ""
+
+
+async def stream_individual_agent(
+    mock_purchases: dict[str, Any],
+    user_query: str,
+    today: str,
+) -> AsyncIterator[str]:
+    """
+    Stream the agent's reply as text chunks while the model generates it.
+
+    Uses the primary model and tools of run_individual_agent. If the stream fails
+    or stalls for the configured timeout before producing text, the
+    deterministic recommendation is yielded instead; after that, errors end the
+    stream early.
+    """
+    if not api_key():
+        logger.warning("DEDALUS_API_KEY not set; returning fallback recommendation.")
+        yield _build_deterministic_recommendation(mock_purchases, user_query, today)
+        return
+
+    runner = _get_runner()
+    produced = False
     try:
-        return await _execute_agent("openai/gpt-4.1-mini", False, secondary_timeout)
-    except (asyncio.TimeoutError, APITimeoutError) as timeout_exc:
-        logger.error(
-            "Individual agent secondary attempt also timed out after %s seconds (%s).",
-            secondary_timeout,
-            timeout_exc,
-        )
-    except Exception as secondary_exc:
-        logger.exception(
-            "Individual agent secondary attempt failed; falling back. Error: %s",
-            secondary_exc,
+        stream = runner.run(
+            input=_build_prompt(_compact_purchase_history(mock_purchases), user_query, today),
+            model="openai/gpt-5",
+            mcp_servers=["windsor/brave-search-mcp"],
+            max_tokens=_MAX_OUTPUT_TOKENS,
+            stream=True,
         )
+        if inspect.isawaitable(stream):
+            stream = await asyncio.wait_for(stream, timeout=_TIMEOUT_SECONDS)
+        chunks = stream.__aiter__()
+        while True:
+            try:
+                # Bound the wait for each chunk rather than the whole reply
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=_TIMEOUT_SECONDS)
+            except StopAsyncIteration:
+                break
+            text = _chunk_text(chunk)
+            if text:
+                produced = True
+                yield text
+    except Exception as exc:
+        if produced:
+            logger.error("Individual agent stream ended early: {}", exc)
+            return
+        logger.warning("Individual agent stream failed ({}); returning fallback recommendation.", exc)
+        yield _build_deterministic_recommendation(mock_purchases, user_query, today)
+
+
+async def run_individual_agent_many(
+    items: Sequence[tuple[dict[str, Any], str, str]],
+) -> list[str]:
+    """
+    Run the agent for many ``(mock_purchases, user_query, today)`` items concurrently.
 
-    return _build_deterministic_recommendation(mock_purchases, user_query, today)
+    At most DEDALUS_CONCURRENCY (default 8) requests are in flight at once, and
+    results come back in input order. An item whose run raises gets the
+    deterministic fallback recommendation instead.
+    """
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+    async def _run_one(mock_purchases: dict[str, Any], user_query: str, today: str) -> str:
+        async with semaphore:
+            return await run_individual_agent(
+                mock_purchases=mock_purchases,
+                user_query=user_query,
+                today=today,
+            )
+
+    results = await asyncio.gather(*(_run_one(*item) for item in items), return_exceptions=True)
+    outputs = []
+    for (mock_purchases, user_query, today), result in zip(items, results):
+        if isinstance(result, BaseException):
+            logger.error("Individual agent batch item failed: {}", result)
+            result = _build_deterministic_recommendation(mock_purchases, user_query, today)
+        outputs.append(result)
+    return outputs
+
+
+def run_individual_agent_batch(
+    items: Sequence[tuple[dict[str, Any], str, str]],
+) -> list[str]:
+    """Synchronous helper running many queries on the shared background loop."""
+    if not items:
+        return []
+    return run_sync(run_individual_agent_many(items))
 
 
 def run_individual_agent_sync(
@@ -284,21 +597,12 @@ def run_individual_agent_sync(
     today: str,
 ) -> str:
     """Synchronous helper for running the agent in non-async contexts."""
-    # if not _DEDALUS_AVAILABLE:
-    #     return (
-    #         "The decision advisor is temporarily unavailable because the Dedalus Labs "
-    #         "agent runtime is not installed on this server."
-    #     )
-    load_dotenv()
-    # api_key = os.getenv("DEDALUS_API_KEY")
-    
-    load_dotenv()
-    api_key = os.getenv("DEDALUS_API_KEY")
-    if not api_key:
+    if not api_key():
         logger.warning("DEDALUS_API_KEY not set; returning fallback recommendation.")
         return _build_deterministic_recommendation(mock_purchases, user_query, today)
 
-    return asyncio.run(
+    # run_individual_agent bounds its own attempts, so no extra timeout is needed here
+    return run_sync(
         run_individual_agent(
             mock_purchases=mock_purchases,
             user_query=user_query,